@@ -0,0 +1,63 @@
+"""
+Benchmark: customers/sec of the batch screening engine (screening/batch.py) against the
+index built from cleaned/.
+
+A synthetic customer file is written first. Most names are random, and a share are
+listed names or aliases with one typo or reordered words. Reports throughput and the
+projected time for 1M customers with the given number of workers.
+
+    python -m benchmarks.bench_batch_screening --customers 1000000 --workers 8
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from utils.artifacts import write_records
+from screening import batch
+from benchmarks.bench_screening import perturb, random_name
+
+
+def write_customers(path, count, listed_share, rng):
+    names = batch._load_index().entry_text
+    customers = (
+        {
+            "customer_id": number,
+            "name": perturb(rng.choice(names), rng) if rng.random() < listed_share else random_name(rng),
+        }
+        for number in range(1, count + 1)
+    )
+    write_records(customers, ["customer_id", "name"], path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--listed", type=float, default=0.01, help="share of customers that are listed names")
+    parser.add_argument("--workers", type=int, default=batch.SCREEN_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=batch.SCREEN_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    batch._load_index()
+    print(f"Index built in {time.perf_counter() - start:.1f}s")
+
+    with tempfile.TemporaryDirectory(prefix="screening_") as directory:
+        customers = os.path.join(directory, "customers.csv")
+        matches = os.path.join(directory, "matches.csv")
+        write_customers(customers, args.customers, args.listed, random.Random(args.seed))
+
+        start = time.perf_counter()
+        match_count = batch.screen_file(customers, matches, "name", "customer_id", args.workers, args.chunk_size)
+        seconds = time.perf_counter() - start
+
+    rate = args.customers / seconds
+    print(f"{args.customers} customers, {args.workers} workers: {seconds:.1f}s, {rate:,.0f} customers/s, "
+          f"{match_count} matches")
+    print(f"1M customers: ~{1_000_000 / rate / 60:.1f} min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: startup time of the screening index built from cleaned/ versus opened from its
+memory-mapped snapshot (screening/snapshot.py), and search latency on both.
+
+The snapshot is written to a temporary directory, then opened --opens times. Searches
+with the same perturbed listed names and random names must return identical results
+from both indexes.
+
+    python -m benchmarks.bench_index_snapshot --queries 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from screening.index import build_from_cleaned
+from screening.snapshot import open_snapshot, write_snapshot
+from benchmarks.bench_screening import perturb, random_name
+
+
+def search_ms(index, queries):
+    timings = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(index.search(query))
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return results, timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--opens", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    built = build_from_cleaned()
+    build_seconds = time.perf_counter() - start
+    print(f"Built {len(built.entities)} entities ({len(built)} names and aliases) in {build_seconds * 1000:.0f} ms")
+
+    with tempfile.TemporaryDirectory(prefix="snapshot_") as directory:
+        path = os.path.join(directory, "screening.idx")
+        start = time.perf_counter()
+        size = write_snapshot(built, path)
+        print(f"Wrote snapshot ({size / 1024 / 1024:.1f} MB) in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        opens = []
+        for _ in range(args.opens):
+            start = time.perf_counter()
+            mapped = open_snapshot(path)
+            opens.append((time.perf_counter() - start) * 1000)
+        open_ms = statistics.median(opens)
+        print(f"Opened snapshot in {open_ms:.1f} ms (median of {args.opens}), "
+              f"{build_seconds * 1000 / open_ms:.0f}x faster than building")
+
+        rng = random.Random(args.seed)
+        queries = [
+            perturb(rng.choice(built.entry_text), rng) if rng.random() < 0.5 else random_name(rng)
+            for _ in range(args.queries)
+        ]
+        built_results, built_p50, built_p99 = search_ms(built, queries)
+        mapped_results, mapped_p50, mapped_p99 = search_ms(mapped, queries)
+
+    print(f"Search p50/p99: built {built_p50:.2f}/{built_p99:.2f} ms, snapshot {mapped_p50:.2f}/{mapped_p99:.2f} ms")
+    print(f"Identical results: {built_results == mapped_results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: rows/sec of the common-schema loaders (row, bulk, preload, staging, reload)
+against the MySQL database configured in .env.
+
+Each mode loads the same cleaned file under its own throw-away Source value
+(bench-<mode>), so existing data is not touched; those rows are deleted afterwards.
+Start a local server with `docker compose --profile local-db up -d mysql` and run
+
+    python -m benchmarks.bench_loaders --input cleaned/sdn_USOFAC_SDN_cleaned.csv --rows 20000
+
+Pending run: the staging mode has not been measured against local-db yet.
+"""
+import argparse
+import itertools
+import time
+
+from utils.artifacts import read_records
+from utils.db_connection import pooled_connection
+from loaders.common_loader import CHILD_TABLES, insert_common_data, insert_common_data_bulk
+from loaders.staging_loader import insert_common_data_staged
+from loaders.reload_loader import reload_common_data
+
+MODES = {
+    "row": insert_common_data,
+    "bulk": insert_common_data_bulk,
+    "preload": lambda data: insert_common_data_bulk(data, preload=True),
+    "staging": insert_common_data_staged,
+    "reload": reload_common_data,
+}
+
+
+def bench_rows(path, rows, source):
+    data = read_records(path)
+    return [dict(row, Source=source) for row in itertools.islice(itertools.cycle(data), rows)]
+
+
+def delete_source(source):
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            for table, _, _ in CHILD_TABLES:
+                cursor.execute(
+                    f"DELETE t FROM {table} t JOIN sanctioned_entities e ON e.entity_id = t.entity_id "
+                    "WHERE e.source = %s",
+                    (source,)
+                )
+            cursor.execute("DELETE FROM sanctioned_entities WHERE source = %s", (source,))
+        conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--input", default="cleaned/sdn_USOFAC_SDN_cleaned.csv")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    args = parser.parse_args()
+
+    results = {}
+    for mode in args.modes:
+        source = f"bench-{mode}"
+        data = bench_rows(args.input, args.rows, source)
+        delete_source(source)
+        start = time.perf_counter()
+        MODES[mode](data)
+        results[mode] = len(data) / (time.perf_counter() - start)
+        delete_source(source)
+
+    print(f"{args.rows} rows from {args.input}")
+    print(f"{'mode':<10}{'rows/s':>12}{'vs row':>10}")
+    for mode, rate in results.items():
+        relative = f"{rate / results['row']:.1f}x" if "row" in results else "-"
+        print(f"{mode:<10}{rate:>12,.0f}{relative:>10}")
+
+
+if __name__ == "__main__":
+    main()
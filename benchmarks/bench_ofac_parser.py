@@ -0,0 +1,130 @@
+"""
+Benchmark: streaming parse_ofac vs the previous double ET.fromstring implementation.
+
+Generates a synthetic SDN feed of the requested size and parses it with both
+implementations, each in a fresh process so peak RSS is measured independently.
+
+    python -m benchmarks.bench_ofac_parser --size-mb 300
+"""
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+from extractors.ofac_parser import parse_ofac
+
+NS = "https://sanctionslistservice.ofac.treas.gov/api/PublicationPreview/exports/XML"
+
+ENTRY_TEMPLATE = """  <sdnEntry>
+    <uid>{uid}</uid>
+    <firstName>Firstname{uid}</firstName>
+    <lastName>LASTNAME{uid}</lastName>
+    <sdnType>Individual</sdnType>
+    <programList>
+      <program>SDGT</program>
+      <program>IRAN-EO13876</program>
+    </programList>
+    <akaList>
+      <aka>
+        <uid>{aka_uid}</uid>
+        <type>a.k.a.</type>
+        <category>strong</category>
+        <lastName>ALIAS{uid}</lastName>
+        <firstName>Other</firstName>
+      </aka>
+    </akaList>
+    <nationalityList>
+      <nationality>
+        <uid>{nat_uid}</uid>
+        <country>Iran</country>
+        <mainEntry>true</mainEntry>
+      </nationality>
+    </nationalityList>
+  </sdnEntry>
+"""
+
+
+def write_synthetic_sdn(path, size_mb):
+    target = size_mb * 1024 * 1024
+    written = 0
+    uid = 0
+    with open(path, "w", encoding="utf-8") as f:
+        header = f'<?xml version="1.0" standalone="yes"?>\n<sdnList xmlns="{NS}">\n'
+        f.write(header)
+        written += len(header)
+        while written < target:
+            uid += 1
+            entry = ENTRY_TEMPLATE.format(uid=uid, aka_uid=uid * 2, nat_uid=uid * 3)
+            f.write(entry)
+            written += len(entry)
+        f.write("</sdnList>\n")
+    return uid
+
+
+def parse_ofac_legacy(xml_data, source):
+    # Previous implementation: two full ElementTree builds over the whole document
+    ns_uri = ET.fromstring(xml_data).tag
+    ns = {'ns': ns_uri[ns_uri.find("{")+1 : ns_uri.find("}")]}
+    records = []
+    for entry in ET.fromstring(xml_data).findall(".//ns:sdnEntry", ns):
+        fn = entry.findtext("ns:firstName", default="", namespaces=ns)
+        ln = entry.findtext("ns:lastName",  default="", namespaces=ns)
+        name = f"{fn} {ln}".strip() or entry.findtext("ns:programList", default="Unknown", namespaces=ns)
+        aka = entry.findtext("ns:akaList/ns:aka/ns:lastName", default="None", namespaces=ns)
+        nationality = entry.findtext("ns:nationalityList/ns:nationality/ns:country", default="Unknown", namespaces=ns)
+        designation = entry.findtext("ns:sdnType", default="Unknown", namespaces=ns)
+        programs = entry.findall("ns:programList/ns:program", ns)
+        sanction_types = [p.text for p in programs if p is not None]
+        records.append({
+            "Name": name,
+            "Alias": aka,
+            "Nationality": nationality,
+            "Designation": designation,
+            "Sanction Type": ", ".join(sanction_types) if sanction_types else "Unknown",
+            "Source": source,
+        })
+    return records
+
+
+def _run(impl, path, queue):
+    start = time.perf_counter()
+    if impl == "legacy":
+        with open(path, "r", encoding="utf-8") as f:
+            count = len(parse_ofac_legacy(f.read(), "USOFAC-SDN"))
+    else:
+        count = sum(1 for _ in parse_ofac(path, "USOFAC-SDN"))
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put((count, elapsed, peak_mb))
+
+
+def measure(impl, path):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run, args=(impl, path, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sdn_synthetic.xml")
+        entries = write_synthetic_sdn(path, args.size_mb)
+        print(f"Synthetic SDN feed: {os.path.getsize(path) / 1024 / 1024:.0f} MB, {entries} entries")
+
+        for impl in ("legacy", "streaming"):
+            count, elapsed, peak_mb = measure(impl, path)
+            print(f"{impl:>9}: {count} records in {elapsed:.2f}s, peak RSS {peak_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
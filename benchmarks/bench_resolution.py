@@ -0,0 +1,79 @@
+"""
+Benchmark: how entity resolution (etl/resolve.py) scales with the number of records,
+compared with the all-pairs comparison it replaces.
+
+Records are built from the common-schema cleaned files like the loaders would store
+them: one per (name, source), with aliases and nationalities. Sizes above the real
+record count are made by adding copies under a new source with one typo per name.
+
+    python -m benchmarks.bench_resolution --sizes 5000 10000 20000 40000 80000
+"""
+import argparse
+import glob
+import os
+import random
+import time
+
+from utils.artifacts import iter_records
+from loaders.common_loader import fold, safe_parse_list
+from etl.resolve import resolve
+from benchmarks.bench_screening import perturb
+
+SKIP_PREFIXES = ("can_", "interpol")
+
+
+def cleaned_records(directory="cleaned"):
+    records = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*_cleaned.csv"))):
+        if os.path.basename(path).startswith(SKIP_PREFIXES):
+            continue
+        for row in iter_records(path):
+            if not row.get("Name"):
+                continue
+            record = records.setdefault((fold(row["Name"]), fold(row["Source"])), {
+                "id": len(records) + 1, "name": row["Name"], "source": row["Source"],
+                "aliases": [], "nationalities": [],
+            })
+            record["aliases"].extend(safe_parse_list(row.get("Alias")))
+            record["nationalities"].extend(safe_parse_list(row.get("Nationality")))
+    return list(records.values())
+
+
+def sample(records, size, rng):
+    if size <= len(records):
+        return rng.sample(records, size)
+    result = list(records)
+    copy = 0
+    while len(result) < size:
+        copy += 1
+        for record in records[:size - len(result)]:
+            result.append({
+                **record,
+                "id": len(result) + 1,
+                "name": perturb(record["name"], rng),
+                "aliases": [perturb(alias, rng) for alias in record["aliases"]],
+                "source": f"{record['source']}-copy{copy}",
+            })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5_000, 10_000, 20_000, 40_000, 80_000])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    records = cleaned_records()
+    print(f"{len(records)} records in cleaned/")
+    print(f"{'records':>8}{'pairs':>12}{'all pairs':>16}{'seconds':>10}{'us/record':>11}{'clustered':>11}")
+    for size in args.sizes:
+        data = sample(records, size, random.Random(args.seed))
+        start = time.perf_counter()
+        rows, pair_count = resolve(data)
+        seconds = time.perf_counter() - start
+        print(f"{size:>8}{pair_count:>12,}{size * (size - 1) // 2:>16,}{seconds:>10.1f}"
+              f"{seconds / size * 1e6:>11.0f}{len(rows):>11}")
+
+
+if __name__ == "__main__":
+    main()
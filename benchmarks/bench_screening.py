@@ -0,0 +1,83 @@
+"""
+Benchmark: query latency of the trigram screening index (screening/index.py) built
+from every cleaned artifact in cleaned/.
+
+Queries are names and aliases drawn from the index with one random typo (dropped,
+swapped or replaced character) or reordered words, plus a share of names that are not
+on any list. Reports build time and p50/p90/p99/max latency per query.
+
+    python -m benchmarks.bench_screening --queries 20000
+"""
+import argparse
+import random
+import string
+import time
+
+from screening.index import SCREEN_THRESHOLD, SCREEN_TOP_K, build_from_cleaned
+
+
+def perturb(text, rng):
+    words = text.split()
+    edit = rng.choice(["drop", "swap", "replace", "reorder"])
+    if edit == "reorder" and len(words) > 1:
+        rng.shuffle(words)
+        return " ".join(words)
+    if len(text) < 3:
+        return text
+    i = rng.randrange(len(text) - 1)
+    if edit == "drop":
+        return text[:i] + text[i + 1:]
+    if edit == "swap":
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return text[:i] + rng.choice(string.ascii_lowercase) + text[i + 1:]
+
+
+def random_name(rng):
+    return " ".join(
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+        for _ in range(rng.randint(2, 3))
+    )
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--unlisted", type=float, default=0.2, help="share of queries not on any list")
+    parser.add_argument("--top", type=int, default=SCREEN_TOP_K)
+    parser.add_argument("--threshold", type=float, default=SCREEN_THRESHOLD)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_from_cleaned()
+    build_seconds = time.perf_counter() - start
+
+    rng = random.Random(args.seed)
+    queries = [
+        random_name(rng) if rng.random() < args.unlisted else perturb(rng.choice(index.entry_text), rng)
+        for _ in range(args.queries)
+    ]
+
+    latencies = []
+    hits = 0
+    for query in queries:
+        start = time.perf_counter()
+        matches = index.search(query, args.top, args.threshold)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += bool(matches)
+    latencies.sort()
+
+    print(f"{len(index.entities)} entities, {len(index)} names/aliases, "
+          f"{len(index.gram_ids)} trigrams, built in {build_seconds:.1f}s")
+    print(f"{len(queries)} queries (threshold {args.threshold}, top {args.top}), {hits} with matches")
+    for label, fraction in [("p50", 0.5), ("p90", 0.9), ("p99", 0.99)]:
+        print(f"{label:<5}{percentile(latencies, fraction):>8.3f} ms")
+    print(f"{'max':<5}{latencies[-1]:>8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
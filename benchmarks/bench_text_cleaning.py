@@ -0,0 +1,92 @@
+"""
+Benchmark: per-value Series.apply cleaning vs the shared vectorized kernel in
+transformers/text_cleaning.py, reported as rows/sec for each cleaning step.
+
+Input is a parsed CSV from output/ repeated up to the requested number of rows.
+
+    python -m benchmarks.bench_text_cleaning --rows 500000 --input output/eur_Europe_parsed.csv
+"""
+import argparse
+import re
+import time
+
+import pandas as pd
+
+from transformers import text_cleaning
+
+
+# Previous per-value helpers, as they were defined in each transformer
+def legacy_clean_text(text):
+    if pd.isna(text):
+        return ""
+    cleaned = re.sub(r'[^\w\s]', '', text)
+    cleaned = re.sub(r'\s+', ' ', cleaned)
+    return cleaned.strip()
+
+
+def legacy_contains_garbage(text):
+    try:
+        text.encode('ascii')
+        return False
+    except UnicodeEncodeError:
+        return True
+
+
+def legacy_fix_mojibake(text):
+    if pd.isna(text):
+        return ""
+    try:
+        return text.encode('latin1').decode('utf-8')
+    except Exception:
+        return text
+
+
+def legacy_first_alias(alias_text):
+    if pd.isna(alias_text) or legacy_contains_garbage(str(alias_text)):
+        return None
+    return legacy_clean_text(re.split(r'[;,/]', alias_text)[0])
+
+
+def legacy_simplify_designation(text):
+    if pd.isna(text):
+        return ""
+    return legacy_clean_text(re.split(r'[.-]', text)[0])
+
+
+STEPS = [
+    # step name, column, legacy per-row function, vectorized function
+    ("punctuation + whitespace", "Designation", lambda s: s.apply(legacy_clean_text), text_cleaning.clean_text),
+    ("non-ASCII detection", "Name", lambda s: s.apply(lambda x: legacy_contains_garbage(str(x))), text_cleaning.contains_garbage),
+    ("mojibake repair", "Alias", lambda s: s.apply(legacy_fix_mojibake), text_cleaning.fix_mojibake),
+    ("first-alias split", "Alias", lambda s: s.apply(legacy_first_alias), text_cleaning.first_alias),
+    ("designation simplify", "Designation", lambda s: s.apply(legacy_simplify_designation), text_cleaning.simplify_designation),
+]
+
+
+def rows_per_sec(fn, series):
+    start = time.perf_counter()
+    fn(series)
+    return len(series) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--input", default="output/eur_Europe_parsed.csv")
+    args = parser.parse_args()
+
+    sample = pd.read_csv(args.input, encoding="utf-8")
+    repeats = -(-args.rows // len(sample))
+    df = pd.concat([sample] * repeats, ignore_index=True).head(args.rows)
+
+    print(f"{len(df)} rows from {args.input}")
+    print(f"{'step':<26}{'apply rows/s':>15}{'vectorized rows/s':>20}{'speedup':>10}")
+    for name, column, legacy_fn, vectorized_fn in STEPS:
+        series = df[column]
+        before = rows_per_sec(legacy_fn, series)
+        after = rows_per_sec(vectorized_fn, series)
+        print(f"{name:<26}{before:>15,.0f}{after:>20,.0f}{after / before:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
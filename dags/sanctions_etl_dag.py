@@ -10,6 +10,9 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Import ETL functions
 from etl.etl import test_db_connection, extract, transform, load
+from etl.delta import compute_deltas
+from etl.resolve import resolve_entities
+from screening.snapshot import snapshot_index
 
 default_args = {
     'owner': 'airflow',
@@ -41,9 +44,21 @@ def transform_task(**context):
     transformed_files = transform(extracted_files)
     context['ti'].xcom_push(key='transformed_files', value=transformed_files)
 
-def load_task(**context):
+def delta_task(**context):
     transformed_files = context['ti'].xcom_pull(key='transformed_files', task_ids='transform_data')
-    load(transformed_files)
+    delta_files = compute_deltas(transformed_files)
+    context['ti'].xcom_push(key='delta_files', value=delta_files)
+
+def load_task(**context):
+    delta_files = context['ti'].xcom_pull(key='delta_files', task_ids='compute_delta')
+    load_report = load(delta_files, delta=True)
+    context['ti'].xcom_push(key='load_report', value=load_report)
+
+def resolve_task():
+    resolve_entities()
+
+def snapshot_task():
+    snapshot_index()
 
 test_db = PythonOperator(
     task_id='test_db_connection',
@@ -63,14 +78,32 @@ transform_data = PythonOperator(
     dag=dag,
 )
 
+compute_delta = PythonOperator(
+    task_id='compute_delta',
+    python_callable=delta_task,
+    dag=dag,
+)
+
 load_data = PythonOperator(
     task_id='load_data',
     python_callable=load_task,
     dag=dag,
 )
+
+resolve_clusters = PythonOperator(
+    task_id='resolve_entities',
+    python_callable=resolve_task,
+    dag=dag,
+)
+
+snapshot_screening_index = PythonOperator(
+    task_id='snapshot_screening_index',
+    python_callable=snapshot_task,
+    dag=dag,
+)
  
 # extract_data >> transform_data
 # test_db >> load_data
 # transform_data >> load_data
 
-extract_data >> transform_data >> test_db >> load_data
+extract_data >> transform_data >> compute_delta >> test_db >> load_data >> resolve_clusters >> snapshot_screening_index
@@ -0,0 +1,230 @@
+"""
+Delta stage between transform and load.
+
+Every cleaned file is grouped by the key its table is deduplicated on (see
+loaders/delta_loader.DELTA_TABLES) and each key gets a fingerprint of all its rows.
+Comparing those with the snapshot of the last successful load gives:
+
+- added   - keys not in the snapshot
+- changed - keys whose fingerprint differs
+- removed - keys in the snapshot that are gone today (marked delisted, never deleted)
+
+Only the rows of added and changed keys are written to a `<stem>_delta` artifact and
+loaded, so the database work follows the size of the change. The new snapshot is
+written next to the old one and only replaces it once the load succeeded
+(commit_snapshot); a failed load is simply recomputed and applied again next run.
+Deleting snapshots/ forces a full load.
+"""
+import hashlib
+import json
+import os
+
+from utils.artifacts import artifact_path, read_records, write_records
+from loaders.common_loader import fold, safe_parse_list
+from loaders.delta_loader import apply_delta_changes, delta_spec, key_params
+from loaders.load_to_db import COMMON_PARSER_KEYS, LOAD_MODE, load_parsed_data, reload_parsed_data
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_DIR = os.path.join(BASE_DIR, "snapshots")
+CLEANED_DIR = os.path.join(BASE_DIR, "cleaned")
+
+# If more than this share of yesterday's keys disappears, the feed is assumed broken:
+# removals are not applied and the missing keys are carried over to the new snapshot.
+DELTA_MAX_REMOVED_FRACTION = float(os.getenv("DELTA_MAX_REMOVED_FRACTION", "0.5"))
+
+# Multi-valued fields, compared as sets so a reordered list is not a change
+LIST_FIELDS = {"Alias", "Nationality", "Sanction Type"}
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def row_fingerprint(row):
+    parts = []
+    for field in sorted(row):
+        value = row[field]
+        if field in LIST_FIELDS:
+            value = ",".join(sorted({fold(v) for v in safe_parse_list(value)}))
+        elif isinstance(value, str):
+            value = fold(value.strip())
+        parts.append(f"{field}={'' if value is None else value}")
+    return _digest("\x1f".join(parts))
+
+
+def key_id(spec, row):
+    # Folded like the tables' case-insensitive collation, so the key matches what the DB dedups on
+    return _digest("\x1f".join(str(fold(value)) for value in key_params(spec, row)))
+
+
+def snapshot_path(stem):
+    return os.path.join(SNAPSHOT_DIR, f"{stem}.json")
+
+
+def read_snapshot(stem):
+    """Returns {key_id: [fingerprint, key_params]} of the last successful load, or None."""
+    path = snapshot_path(stem)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(data, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_file, path)
+
+
+def compute_delta(parser_key, source_name, cleaned_path):
+    """
+    Diffs one cleaned file against its snapshot. Writes the delta artifact, the pending
+    snapshot and a manifest describing both; returns the manifest path (None to skip).
+    """
+    stem = f"{parser_key}_{source_name}"
+    spec = delta_spec(parser_key)
+    if not (cleaned_path and os.path.exists(cleaned_path)):
+        print(f"❌ No cleaned file for {stem}, skipping delta")
+        return None
+
+    rows = read_records(cleaned_path)
+    if not rows:
+        # An empty feed would delist everything; keep the snapshot and load nothing
+        print(f"❌ No records in {cleaned_path}, skipping delta")
+        return None
+
+    if spec is None:
+        print(f"ℹ️ No delta support for {parser_key}, loading {cleaned_path} in full")
+        manifest = {"records": cleaned_path, "cleaned": cleaned_path, "removed": [], "carried": [], "relisted": [],
+                    "changed": [], "snapshot": None}
+        manifest_path = os.path.join(CLEANED_DIR, f"{stem}_delta.json")
+        write_json(manifest, manifest_path)
+        return manifest_path
+
+    # Rows of each key in file order; a key's fingerprint covers all of its rows
+    groups = {}
+    for row in rows:
+        groups.setdefault(key_id(spec, row), []).append(row)
+    current = {
+        kid: [_digest("".join(sorted(row_fingerprint(row) for row in group))), key_params(spec, group[0])]
+        for kid, group in groups.items()
+    }
+
+    previous = read_snapshot(stem)
+    baseline = previous is not None
+    previous = previous or {}
+
+    added = [kid for kid in current if kid not in previous]
+    changed = [kid for kid in current if kid in previous and previous[kid][0] != current[kid][0]]
+    removed = [kid for kid in previous if kid not in current]
+
+    carried = []
+    if previous and len(removed) > DELTA_MAX_REMOVED_FRACTION * len(previous):
+        print(f"⚠️ {stem}: {len(removed)} of {len(previous)} records missing, not delisting them this run")
+        for kid in removed:
+            current[kid] = previous[kid]
+        carried, removed = removed, []
+
+    delta_keys = set(added) | set(changed)
+    delta_rows = [row for row in rows if key_id(spec, row) in delta_keys]
+    records_path = None
+    if delta_rows:
+        records_path = artifact_path(CLEANED_DIR, f"{stem}_delta")
+        write_records(delta_rows, list(rows[0].keys()), records_path)
+
+    pending = f"{snapshot_path(stem)}.pending"
+    write_json(current, pending)
+
+    manifest = {
+        "records": records_path,
+        "cleaned": cleaned_path,
+        "removed": [previous[kid][1] for kid in removed],
+        # Missing keys the guard kept listed; only a reload, which reads the full file, needs them
+        "carried": [previous[kid][1] for kid in carried],
+        # Keys that were delisted earlier can only reappear once a snapshot exists
+        "relisted": [current[kid][1] for kid in added] if baseline else [],
+        "changed": [
+            {"key": current[kid][1], "updates": [groups[kid][0].get(field) for field, _ in spec["updates"]]}
+            for kid in changed
+        ],
+        "snapshot": {"pending": pending, "path": snapshot_path(stem)},
+    }
+    manifest_path = os.path.join(CLEANED_DIR, f"{stem}_delta.json")
+    write_json(manifest, manifest_path)
+
+    print(f"🔍 Delta for {stem}: {len(added)} added, {len(changed)} changed, {len(removed)} removed "
+          f"(of {len(current)} keys)")
+    return manifest_path
+
+
+def compute_deltas(transformed_files):
+    """Runs compute_delta for every transformed file; returns (parser_key, source_name, manifest_path) entries."""
+    deltas = []
+    for parser_key, source_name, cleaned_path in transformed_files:
+        manifest_path = compute_delta(parser_key, source_name, cleaned_path)
+        if manifest_path:
+            deltas.append((parser_key, source_name, manifest_path))
+    return deltas
+
+
+def commit_snapshot(manifest):
+    snapshot = manifest.get("snapshot")
+    if snapshot and os.path.exists(snapshot["pending"]):
+        os.replace(snapshot["pending"], snapshot["path"])
+
+
+def load_delta(parser_key, manifest_path):
+    """
+    Applies one delta: delist/relist/reset changed keys, insert the added and changed
+    rows with the regular loader, then commit the snapshot. Returns True when applied.
+    With LOAD_MODE=reload, common sources are replaced from the full cleaned file instead.
+
+    Raises when the records were not loaded. The snapshot is then left as it was, so
+    the next run computes and applies the same changes again.
+    """
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if LOAD_MODE == "reload" and parser_key in COMMON_PARSER_KEYS:
+        return reload_deltas([manifest_path])
+
+    # Checked before anything is changed, since the delta step clears child rows the records rebuild
+    if manifest["records"] and not os.path.exists(manifest["records"]):
+        raise FileNotFoundError(f"Delta records not found: {manifest['records']}")
+
+    if delta_spec(parser_key):
+        apply_delta_changes(parser_key, manifest)
+    if manifest["records"]:
+        if not load_parsed_data(parser_key, manifest["records"]):
+            raise RuntimeError(f"Delta records for {parser_key} were not loaded: {manifest['records']}")
+    else:
+        print(f"✅ No new or changed records for {parser_key}")
+
+    commit_snapshot(manifest)
+    return True
+
+
+def reload_deltas(manifest_paths):
+    """
+    LOAD_MODE=reload: replaces the common sources of `manifest_paths` from their full
+    cleaned files in one shadow-table reload, then commits their snapshots. A reload must
+    see every record, not just the delta. It is handed the removed keys to stamp delisted
+    and the carried-over keys to keep listed (reload_loader.keep_delisted), so a truncated
+    feed delists nothing here either. Raises, leaving the snapshots alone, when nothing was
+    loaded.
+    """
+    manifests = []
+    for manifest_path in manifest_paths:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifests.append(json.load(f))
+
+    cleaned = [manifest["cleaned"] for manifest in manifests]
+    removed = [key for manifest in manifests for key in manifest["removed"]]
+    carried = [key for manifest in manifests for key in manifest.get("carried", [])]
+    if not reload_parsed_data(cleaned, removed=removed, carried=carried):
+        raise RuntimeError(f"Reload did not load {', '.join(cleaned)}")
+    for manifest in manifests:
+        commit_snapshot(manifest)
+    return True
@@ -1,9 +1,12 @@
 
 import os
 import json
-import subprocess
 import pathlib
-from utils.db_connection import get_connection
+import random
+import time
+import pymysql
+from utils.db_connection import pooled_connection
+from utils.artifacts import EXPORT_CSV, artifact_format, artifact_path, export_csv, write_records
 from extractors.un_parser import parse_un
 from extractors.ofac_sdn import parse_sdn
 from extractors.swiss_parser import parse_swiss
@@ -12,139 +15,310 @@ from extractors.ofac_parser import parse_ofac
 from extractors.austalia_parser import parse_aus
 from extractors.europe_parser import parse_europe
 from extractors.cannda_parser import parse_cannada
-from loaders.load_to_db import load_parsed_data
+from transformers.registry import (
+    has_transformer, is_identity, pass_through, transform_file, transform_file_isolated,
+)
+from loaders.load_to_db import COMMON_PARSER_KEYS, LOAD_MODE, load_parsed_data, reload_parsed_data
+from loaders.schema import migrate
+from etl.delta import compute_deltas, load_delta, reload_deltas
+from etl.resolve import resolve_entities
+from screening.snapshot import snapshot_index
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 OUTPUT_DIR = os.path.join(BASE_DIR, "output")
 CLEANED_DIR = os.path.join(BASE_DIR, "cleaned")
 CONFIG_PATH = os.path.join(BASE_DIR, "config", "sources.json")
-TRANSFORMER_DIR = os.path.join(BASE_DIR, "transformers")
-
-def read_xml_file(file_path):
-    with open(file_path, 'r', encoding='utf-8') as file:
-        return file.read()
-
-def write_to_csv(data, output_file):
-    if not data:
-        print("❌ No data to write.")
-        return
-    fieldnames = data[0].keys()
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        import csv
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
-    print(f"✅ CSV file written: {output_file}")
 
 # Test database connection
 def test_db_connection():
-    conn = get_connection()
-    if conn:
+    try:
+        # Under etl.main the checked connection stays in the pool for the load; Airflow
+        # runs each task in its own process, so there it is only a connectivity check
+        with pooled_connection() as conn:
+            conn.ping(reconnect=False)
         print("✅ Connection successful for DB")
-        conn.close()
         return True
-    else:
-        print("❌ Connection failed")
+    except Exception as e:
+        print(f"❌ Connection failed: {e}")
         return False
 # Extract data from various sources based on the configuration
-def extract():
+PARSER_MAP = {
+    "un": parse_un,
+    "uk": parse_uk,
+    "ofac": parse_ofac,
+    "swiss": parse_swiss,
+    "sdn": parse_sdn,
+    "aus": parse_aus,
+    "eur": parse_europe,
+    "can": parse_cannada,
+}
+
+# Worker processes used by extract(); 1 keeps the sequential behaviour
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "1"))
+# Total virtual address space shared by the extract workers (RLIMIT_AS), 0 = unlimited.
+# This is not a cap on resident memory: NumPy, pyarrow and glibc malloc arenas reserve far
+# more address space than they use (a parser worker maps ~330 MB for ~65 MB resident), so
+# size it at several times the peak worker RSS that extract_parallel reports.
+EXTRACT_ADDRESS_SPACE_MB = int(os.getenv("EXTRACT_ADDRESS_SPACE_MB", "0"))
+
+def extract_source(entry):
+    """Parses one entry of sources.json. Returns (parser_key, source_name, output_path) or None."""
+    parser_key = entry.get("parser")
+    source_name = entry.get("sanction_type", "Unknown").replace(" ", "_").replace("-", "_")
+    file_path = entry.get("path")
+
+    if parser_key == "interpol":
+        print(f"ℹ️ Interpol data will be loaded directly: {file_path}")
+        return (parser_key, source_name, file_path)
+
+    parser_fn = PARSER_MAP.get(parser_key)
+    if not parser_fn:
+        print(f"⚠️ No parser for key: {parser_key}")
+        return None
+
+    if not file_path or not os.path.exists(file_path):
+        print(f"❌ Missing or invalid file path: {file_path}")
+        return None
+
+    print(f"🔍 Parsing: {file_path}")
+    file_ext = pathlib.Path(file_path).suffix.lower()
+    output_path = artifact_path(OUTPUT_DIR, f"{parser_key}_{source_name}_parsed")
+
+    if file_ext not in (".xml", ".csv"):
+        print(f"⚠️ Unsupported file format: {file_ext}")
+        return None
+
+    # Parsers yield records and declare their columns, so nothing is buffered beyond one batch
+    records = parser_fn(file_path, source_name)
+    write_records(records, parser_fn.fieldnames, output_path)
+    return (parser_key, source_name, output_path)
+
+def _limit_worker_address_space(limit_bytes):
+    if limit_bytes:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+
+def _extract_in_worker(entry):
+    """extract_source in a pool worker; also returns the worker's peak RSS so far, in MB."""
+    import resource
+    result = extract_source(entry)
+    # ru_maxrss is in kilobytes on Linux
+    return result, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _file_size(path):
+    return os.path.getsize(path) if path and os.path.exists(path) else 0
+
+def _source_size(entry):
+    return _file_size(entry.get("path"))
+
+def extract_parallel(sources, max_workers, address_space_mb=EXTRACT_ADDRESS_SPACE_MB):
+    """
+    Parses the sources over a pool of `max_workers` processes.
+
+    - The largest files are submitted first so the run takes about as long as the slowest source.
+    - `address_space_mb` is split evenly between workers as an RLIMIT_AS limit (virtual
+      address space, not resident memory); the peak RSS of the workers is reported to size it.
+    - A failing source is reported with its error and left out of the result; the others still run.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    limit_bytes = address_space_mb * 1024 * 1024 // max_workers if address_space_mb else 0
+    results = {}
+    errors = {}
+    peak_rss_mb = 0.0
+
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=_limit_worker_address_space,
+                             initargs=(limit_bytes,)) as pool:
+        order = sorted(range(len(sources)), key=lambda i: _source_size(sources[i]), reverse=True)
+        futures = {i: pool.submit(_extract_in_worker, sources[i]) for i in order}
+        for i, future in futures.items():
+            try:
+                results[i], rss_mb = future.result()
+                peak_rss_mb = max(peak_rss_mb, rss_mb)
+            except Exception as e:
+                errors[sources[i].get("sanction_type", "Unknown")] = e
+
+    for source_name, error in errors.items():
+        print(f"❌ Extraction failed for {source_name}: {error!r}")
+    limit = f"{limit_bytes / 1024 / 1024:.0f} MB" if limit_bytes else "unlimited"
+    print(f"📈 Peak extract worker RSS: {peak_rss_mb:.0f} MB (address space per worker: {limit})")
+
+    # Keep the config order so downstream stages see the same sequence as a sequential run
+    return [results[i] for i in range(len(sources)) if results.get(i)]
+
+def extract(max_workers=None):
     with open(CONFIG_PATH, "r", encoding="utf-8") as f:
         sources = json.load(f)
 
-    parser_map = {
-        "un": parse_un,
-        "uk": parse_uk,
-        "ofac": parse_ofac,
-        "swiss": parse_swiss,
-        "sdn": parse_sdn,
-        "aus": parse_aus,
-        "eur": parse_europe,
-        "can": parse_cannada,
-    }
+    max_workers = max_workers or EXTRACT_WORKERS
+    if max_workers > 1 and len(sources) > 1:
+        return extract_parallel(sources, min(max_workers, len(sources)))
 
     extracted_files = []
     for entry in sources:
-        parser_key = entry.get("parser")
-        source_name = entry.get("sanction_type", "Unknown").replace(" ", "_").replace("-", "_")
-        file_path = entry.get("path")
+        result = extract_source(entry)
+        if result:
+            extracted_files.append(result)
 
-        if parser_key == "interpol":
-            print(f"ℹ️ Interpol data will be loaded directly: {file_path}")
-            extracted_files.append((parser_key, source_name, file_path))
-            continue
+    return extracted_files
+# Transform the extracted data with the registered transformers
+# Set TRANSFORM_ISOLATION=1 to run each transformer in its own interpreter instead of in-process
+TRANSFORM_ISOLATION = os.getenv("TRANSFORM_ISOLATION", "0") == "1"
 
-        parser_fn = parser_map.get(parser_key)
-        if not parser_fn:
-            print(f"⚠️ No parser for key: {parser_key}")
+def transform(extracted_files, isolated=TRANSFORM_ISOLATION):
+    transformed_files = []
+    for parser_key, source_name, extracted_path in extracted_files:
+        if not has_transformer(parser_key):
+            print(f"⚠️ No transformer registered for {parser_key}")
+            transformed_files.append((parser_key, source_name, None))
             continue
 
-        if not file_path or not os.path.exists(file_path):
-            print(f"❌ Missing or invalid file path: {file_path}")
+        if not extracted_path or not os.path.exists(extracted_path):
+            print(f"❌ Extracted file not found: {extracted_path}")
             continue
 
-        print(f"🔍 Parsing: {file_path}")
-        file_ext = pathlib.Path(file_path).suffix.lower()
-        output_csv = os.path.join(OUTPUT_DIR, f"{parser_key}_{source_name}_parsed.csv")
+        cleaned_stem = f"{parser_key}_{source_name}_cleaned"
 
-        if file_ext == ".xml":
-            content = read_xml_file(file_path)
-            parsed_data = parser_fn(content, source_name)
-        elif file_ext == ".csv":
-            parsed_data = parser_fn(file_path, source_name)
-        else:
-            print(f"⚠️ Unsupported file format: {file_ext}")
+        # Identity transforms skip the parse/re-serialize round trip entirely
+        if is_identity(parser_key):
+            cleaned_path = artifact_path(CLEANED_DIR, cleaned_stem, artifact_format(extracted_path))
+            transformed_files.append((parser_key, source_name, pass_through(extracted_path, cleaned_path)))
             continue
 
-        write_to_csv(parsed_data, output_csv)
-        extracted_files.append((parser_key, source_name, output_csv))
+        cleaned_path = artifact_path(CLEANED_DIR, cleaned_stem)
+        print(f"⚙️ Running transformation: {parser_key} ({'subprocess' if isolated else 'in-process'})")
+        if isolated:
+            transform_file_isolated(parser_key, extracted_path, cleaned_path)
+        else:
+            transform_file(parser_key, extracted_path, cleaned_path)
 
-    return extracted_files
-# Transform the extracted data using predefined scripts
-def transform(extracted_files):
-    transform_scripts = {
-        "uk": os.path.join(TRANSFORMER_DIR, "uk_transformed.py"),
-        "un": os.path.join(TRANSFORMER_DIR, "un_transformed.py"),
-        "eur": os.path.join(TRANSFORMER_DIR, "europe_transformed.py"),
-        "aus": os.path.join(TRANSFORMER_DIR, "australia_transformed.py"),
-        "sdn": os.path.join(TRANSFORMER_DIR, "ofac_sdn_transformed.py"),
-        "swiss": os.path.join(TRANSFORMER_DIR, "swiss_transformed.py"),
-        "can": os.path.join(TRANSFORMER_DIR, "cannada_transformed.py"),
-        "ofac": os.path.join(TRANSFORMER_DIR, "ofac_csn_transformed.py"),
-        "interpol": os.path.join(TRANSFORMER_DIR, "interpol_transformed.py"),
-    }
+        if not os.path.exists(cleaned_path):
+            print(f"❌ Cleaned file not found: {cleaned_path}")
+            continue
 
-    transformed_files = []
-    for parser_key, source_name, _ in extracted_files:
-        transform_script = transform_scripts.get(parser_key)
-        if transform_script and os.path.exists(transform_script):
-            print(f"⚙️ Running transformation: {transform_script}")
-            subprocess.run(["python", transform_script], check=True)
-            cleaned_csv = os.path.join(CLEANED_DIR, f"{parser_key}_{source_name}_cleaned.csv")
-            if os.path.exists(cleaned_csv):
-                transformed_files.append((parser_key, source_name, cleaned_csv))
-            else:
-                print(f"❌ Cleaned file not found: {cleaned_csv}")
-        else:
-            print(f"⚠️ No transformation script for {parser_key}")
-            transformed_files.append((parser_key, source_name, None))
+        if EXPORT_CSV:
+            export_csv(cleaned_path)
+        transformed_files.append((parser_key, source_name, cleaned_path))
 
     return transformed_files
-# Load the transformed data into the database
-def load(transformed_files):
-    for parser_key, source_name, cleaned_csv in transformed_files:
+# Load the cleaned files into the database
+# LOAD_WORKERS > 1 loads that many sources at once, each on its own pooled connection
+# (keep it <= DB_POOL_SIZE). Deadlocks / lock wait timeouts retry the whole source, which is
+# safe because a failed load is rolled back and the loaders are idempotent.
+LOAD_WORKERS = int(os.getenv("LOAD_WORKERS", "1"))
+LOAD_RETRIES = int(os.getenv("LOAD_RETRIES", "3"))
+LOAD_RETRY_BACKOFF = float(os.getenv("LOAD_RETRY_BACKOFF", "1"))
+RETRYABLE_DB_ERRORS = {1213, 1205}  # ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT
+
+def _is_retryable(error):
+    return isinstance(error, pymysql.err.OperationalError) and error.args and error.args[0] in RETRYABLE_DB_ERRORS
+
+def load_source(parser_key, source_name, cleaned_csv, delta=False):
+    """
+    Loads one cleaned file (or, with `delta`, applies one delta manifest from compute_deltas),
+    retrying on deadlocks. Returns a status dict for the load report.
+    """
+    report = {"source": f"{parser_key}_{source_name}", "status": "skipped", "attempts": 0, "seconds": 0.0, "error": None}
+    if not (cleaned_csv and os.path.exists(cleaned_csv)):
+        print(f"❌ No cleaned file to load for {parser_key}_{source_name}")
+        return report
+
+    print(f"🗃️ Loading data to DB from: {cleaned_csv}")
+    return _run_load(
+        report, lambda: load_delta(parser_key, cleaned_csv) if delta else load_parsed_data(parser_key, cleaned_csv)
+    )
+
+def reload_sources(entries, delta=False):
+    """
+    LOAD_MODE=reload: replaces every common source of `entries` in a single shadow-table
+    reload, so the tables are rebuilt once per run rather than once per source. Returns
+    one status dict for all of them.
+    """
+    names, paths = [], []
+    for parser_key, source_name, cleaned_csv in entries:
         if cleaned_csv and os.path.exists(cleaned_csv):
-            print(f"🗃️ Loading data to DB from: {cleaned_csv}")
-            load_parsed_data(parser_key, cleaned_csv)
+            names.append(f"{parser_key}_{source_name}")
+            paths.append(cleaned_csv)
         else:
+            # Left out of the reload, its rows are copied over unchanged
             print(f"❌ No cleaned file to load for {parser_key}_{source_name}")
+    report = {"source": "+".join(names) or "common sources", "status": "skipped", "attempts": 0,
+              "seconds": 0.0, "error": None}
+    if not paths:
+        return report
+
+    print(f"🗃️ Reloading data to DB from: {', '.join(paths)}")
+    return _run_load(report, lambda: reload_deltas(paths) if delta else reload_parsed_data(paths))
+
+def _run_load(report, load_fn):
+    """Runs `load_fn` until it succeeds, retrying deadlocks and lock wait timeouts; fills in `report`."""
+    start = time.perf_counter()
+    for attempt in range(1, LOAD_RETRIES + 2):
+        report["attempts"] = attempt
+        try:
+            loaded = load_fn()
+            report["status"] = "loaded" if loaded else "skipped"
+            break
+        except Exception as e:
+            if _is_retryable(e) and attempt <= LOAD_RETRIES:
+                delay = LOAD_RETRY_BACKOFF * 2 ** (attempt - 1) * (1 + random.random())
+                print(f"🔁 {report['source']}: {e.args[1] if len(e.args) > 1 else e}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            report["status"] = "failed"
+            report["error"] = repr(e)
+            break
+    report["seconds"] = round(time.perf_counter() - start, 2)
+    return report
+
+def print_load_report(reports):
+    print("📋 Load report:")
+    for r in reports:
+        line = f"   {r['source']:<32} {r['status']:<8} {r['seconds']:>8.2f}s  attempts={r['attempts']}"
+        if r["error"]:
+            line += f"  {r['error']}"
+        print(line)
+
+def load(transformed_files, max_workers=None, delta=False):
+    migrate()
+    max_workers = max_workers or LOAD_WORKERS
+
+    reports = []
+    if LOAD_MODE == "reload":
+        # All common sources go through one reload, before the other sources are loaded
+        reloaded = [entry for entry in transformed_files if entry[0] in COMMON_PARSER_KEYS]
+        transformed_files = [entry for entry in transformed_files if entry[0] not in COMMON_PARSER_KEYS]
+        if reloaded:
+            reports.append(reload_sources(reloaded, delta=delta))
+
+    if max_workers > 1 and len(transformed_files) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Largest files first, so the total is close to the slowest source
+        order = sorted(range(len(transformed_files)), key=lambda i: _file_size(transformed_files[i][2]), reverse=True)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(transformed_files))) as pool:
+            futures = {i: pool.submit(load_source, *transformed_files[i], delta=delta) for i in order}
+        reports += [futures[i].result() for i in range(len(transformed_files))]
+    else:
+        reports += [load_source(*entry, delta=delta) for entry in transformed_files]
+
+    print_load_report(reports)
+    # A failed source fails the run (and the Airflow task), not only its line in the report
+    failed = [r["source"] for r in reports if r["status"] == "failed"]
+    if failed:
+        raise RuntimeError(f"Load failed for {', '.join(failed)}")
+    return reports
 
 def main():
     if not test_db_connection():
         return
     extracted_files = extract()
     transformed_files = transform(extracted_files)
-    load(transformed_files)
+    delta_files = compute_deltas(transformed_files)
+    load(delta_files, delta=True)
+    resolve_entities()
+    snapshot_index()
 
 if __name__ == "__main__":
     main()
@@ -1,47 +1,55 @@
 import pandas as pd
 import re
+from extractors.records import UNIFIED_FIELDNAMES, record_parser
 
+# Rows read from the DFAT CSV at a time
+CHUNK_SIZE = 10_000
+
+# Patterns applied to 'Additional Information', compiled once for the whole file
+ALIAS_PATTERN = re.compile(r'Also known as[:]? (.*?)(?:\.|Designation:|Review|$)', re.IGNORECASE)
+DESIGNATION_PATTERN = re.compile(r'Designation:\s*(.*?)(?=Review|Belongs to|Member|Also known as|$)', re.IGNORECASE | re.DOTALL)
+LIST_MARKER_PATTERN = re.compile(r'[a-d]\)')
+SOURCE_PATTERN = re.compile(r'(A close associate of .*?|Appointed by .*?)(?:\.|$)', re.IGNORECASE)
+
+@record_parser(UNIFIED_FIELDNAMES)
 def parse_aus(csv_file_path: str, source: str):
-    df = pd.read_csv(csv_file_path)
-    
-    records = []
-
-    for _, row in df.iterrows():
-        # Get fields safely, replace nan with "None"
-        def safe_get(field, default="None"):
-            val = row.get(field, default)
-            if pd.isna(val):
-                return default
-            return str(val).strip()
-        
-        name = safe_get("Name of Individual or Entity", "")
-        nationality = safe_get("Citizenship", "None")
-        sanction_type = safe_get("Committees", "None")
-        additional_info = safe_get("Additional Information", "")
-
-        # Extract alias
-        alias_match = re.search(r'Also known as[:]? (.*?)(?:\.|Designation:|Review|$)', additional_info, re.IGNORECASE)
-        alias = alias_match.group(1).strip() if alias_match else "None"
-
-        # Extract designation
-        designation_match = re.search(r'Designation:\s*(.*?)(?=Review|Belongs to|Member|Also known as|$)', additional_info, re.IGNORECASE | re.DOTALL)
-        if designation_match:
-            designation = designation_match.group(1).strip()
-            designation = re.sub(r'[a-d]\)', '-', designation)  # replace a), b), c) with -
-        else:
-            designation = "Unknown"
-
-        # Extract source info
-        source_match = re.search(r'(A close associate of .*?|Appointed by .*?)(?:\.|$)', additional_info, re.IGNORECASE)
-        source_info = source_match.group(1).strip() if source_match else source
-
-        records.append({
-            "Name":           name,
-            "Alias":          alias,
-            "Nationality":    nationality,
-            "Designation":    designation,
-            "Sanction Type":  sanction_type,
-            "Source":         source_info
-        })
-
-    return records
+    for df in pd.read_csv(csv_file_path, chunksize=CHUNK_SIZE):
+        parsed = _parse_chunk(df, source)
+        # Column lists zipped into dicts are much cheaper than DataFrame.to_dict("records")
+        columns = [parsed[field].tolist() for field in UNIFIED_FIELDNAMES]
+        for values in zip(*columns):
+            yield dict(zip(UNIFIED_FIELDNAMES, values))
+
+def _column(df, field, default):
+    # Column as stripped strings, with missing values (or a missing column) replaced by default
+    if field not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    values = df[field]
+    return values.astype(str).str.strip().where(values.notna(), default).astype(object)
+
+def _parse_chunk(df, source):
+    name = _column(df, "Name of Individual or Entity", "")
+    nationality = _column(df, "Citizenship", "None")
+    sanction_type = _column(df, "Committees", "None")
+    additional_info = _column(df, "Additional Information", "")
+
+    # Extract alias
+    alias = additional_info.str.extract(ALIAS_PATTERN, expand=False).str.strip()
+    alias = alias.fillna("None")
+
+    # Extract designation, replacing a), b), c) with -
+    designation = additional_info.str.extract(DESIGNATION_PATTERN, expand=False).str.strip()
+    designation = designation.str.replace(LIST_MARKER_PATTERN, '-', regex=True).fillna("Unknown")
+
+    # Extract source info
+    source_info = additional_info.str.extract(SOURCE_PATTERN, expand=False).str.strip()
+    source_info = source_info.fillna(source)
+
+    return pd.DataFrame({
+        "Name":           name,
+        "Alias":          alias,
+        "Nationality":    nationality,
+        "Designation":    designation,
+        "Sanction Type":  sanction_type,
+        "Source":         source_info
+    }, columns=UNIFIED_FIELDNAMES)
@@ -1,13 +1,12 @@
 import re
-import xml.etree.ElementTree as ET
+from extractors.records import record_parser
+from extractors.xml_stream import iter_elements
 
 
 
-def parse_cannada(content, source):
-    root = ET.fromstring(content)
-    data = []
-
-    for record in root.findall("record"):
+@record_parser(["name", "nationalities", "date_of_listing", "source"])
+def parse_cannada(xml_source, source):
+    for record in iter_elements(xml_source, ("record",), depth=1):
         first_name = record.findtext("GivenName", "").strip()
         last_name = record.findtext("LastName", "").strip()
 
@@ -26,11 +25,9 @@ def parse_cannada(content, source):
         date_of_listing = record.findtext("DateOfListing", "").strip()
         date_of_listing = date_of_listing if date_of_listing else None
 
-        data.append({
+        yield {
             "name": full_name,
             "nationalities": nationality if nationality else None,
             "date_of_listing": date_of_listing,
             "source": source
-        })
-
-    return data
+        }
@@ -1,13 +1,13 @@
-import xml.etree.ElementTree as ET
 import pandas as pd
 import os
+from extractors.records import UNIFIED_FIELDNAMES, record_parser
+from extractors.xml_stream import iter_elements
 
-def parse_europe(content, source):
+@record_parser(UNIFIED_FIELDNAMES)
+def parse_europe(xml_source, source):
     ns = {'ns': 'http://eu.europa.ec/fpi/fsd/export'}
-    root = ET.fromstring(content)
-    data = []
 
-    for entity in root.findall("ns:sanctionEntity", ns):
+    for entity in iter_elements(xml_source, ("sanctionEntity",), depth=1):
         # Aliases - clean, remove empty and duplicates, join by comma
         aliases = [
             na.get("wholeName").strip()
@@ -41,28 +41,21 @@ def parse_europe(content, source):
         regulation_elem = entity.find("ns:regulation", ns)
         sanction_type = regulation_elem.get("regulationType").strip() if regulation_elem is not None and regulation_elem.get("regulationType") else None
 
-        # Append record
-        data.append({
+        yield {
             "Name": name,
             "Alias": aliases_str,
             "Nationality": nationalities_str,
             "Designation": designations_str,
             "Sanction Type": sanction_type,
             "Source": source
-        })
-
-    return data
+        }
 
 def etl_process(input_xml_path, output_csv_path, source="Europe"):
-    # Read XML content
-    with open(input_xml_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
     # Parse XML and extract data
-    records = parse_europe(content, source)
+    records = list(parse_europe(input_xml_path, source))
 
     # Convert to DataFrame
-    df = pd.DataFrame(records)
+    df = pd.DataFrame(records, columns=parse_europe.fieldnames)
 
     # Save to CSV
     os.makedirs(os.path.dirname(output_csv_path), exist_ok=True)
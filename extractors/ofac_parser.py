@@ -1,16 +1,22 @@
-import xml.etree.ElementTree as ET
+from extractors.records import UNIFIED_FIELDNAMES, record_parser
+from extractors.xml_stream import iter_elements, namespace
 
-def parse_ofac(xml_data: str, source: str):
+@record_parser(UNIFIED_FIELDNAMES)
+def parse_ofac(xml_source, source: str):
 
     """
-    Parses an OFAC SDN feed and returns a list of dicts with keys:
+    Parses an OFAC SDN feed and yields dicts with keys:
       Name, Alias, Nationality, Designation, Sanction Type, Source, Date of Birth, Place of Birth
+
+    The document is read in a single streaming pass: `xml_source` is a file path or binary
+    stream (raw XML text is still accepted), the namespace is taken from the root element and
+    each sdnEntry is emitted and released as soon as it closes.
     """
-    ns_uri = ET.fromstring(xml_data).tag
-    ns = {'ns': ns_uri[ns_uri.find("{")+1 : ns_uri.find("}")]}
-    
-    records = []
-    for entry in ET.fromstring(xml_data).findall(".//ns:sdnEntry", ns):
+    ns = None
+    for root, entry in iter_elements(xml_source, ('sdnEntry',), with_root=True):
+        if ns is None:
+            ns = {'ns': namespace(root.tag)}
+
         # 1) Name
         fn = entry.findtext("ns:firstName", default="", namespaces=ns)
         ln = entry.findtext("ns:lastName",  default="", namespaces=ns)
@@ -43,7 +49,7 @@ def parse_ofac(xml_data: str, source: str):
         # 7) Source (constant passed in)
         source_val = source
         
-        records.append({
+        yield {
             "Name":           name,
             "Alias":          aka,
             "Nationality":    nationality,
@@ -52,6 +58,4 @@ def parse_ofac(xml_data: str, source: str):
             "Source":         source_val,
             # "Date of Birth":  dob,
             # "Place of Birth": pob
-        })
-    
-    return records
+        }
@@ -1,22 +1,26 @@
-import xml.etree.ElementTree as ET 
+from extractors.records import UNIFIED_FIELDNAMES, record_parser
+from extractors.xml_stream import iter_elements
 
-def parse_sdn(xml_data: bytes, source: str):
+@record_parser(UNIFIED_FIELDNAMES)
+def parse_sdn(xml_source, source: str):
     """
     Parses the usoafc-sdn Sanctions List into the unified schema:
       Name, Alias, Nationality, Designation, Sanction Type, Source
-    """
-    root = ET.fromstring(xml_data)
 
-    # 1) Build a map of sanctions-set IDs → English description
+    Programs precede targets in the feed, so the set map is built while streaming.
+    """
+    # 1) Map of sanctions-set IDs → English description
     set_map = {}
-    for prog in root.findall('sanctions-program'):
-        for s in prog.findall("sanctions-set[@lang='eng']"):
-            sid = s.get('ssid')
-            set_map[sid] = s.text.strip()
-
-    records = []
-    # 2) Loop over each <target>
-    for tgt in root.findall('target'):
+
+    for element in iter_elements(xml_source, ('sanctions-program', 'target'), depth=1):
+        if element.tag == 'sanctions-program':
+            for s in element.findall("sanctions-set[@lang='eng']"):
+                sid = s.get('ssid')
+                set_map[sid] = s.text.strip()
+            continue
+
+        # 2) Each <target>
+        tgt = element
         # a) collect all referenced sanctions-set IDs, map to text
         sids = [e.text for e in tgt.findall('sanctions-set-id')]
         sanction_types = [ set_map.get(sid, sid) for sid in sids ]
@@ -45,13 +49,11 @@ def parse_sdn(xml_data: bytes, source: str):
         # f) Designation: the fact that this is an <individual>
         designation = 'individual'
 
-        records.append({
+        yield {
             "Name":           name,
             "Alias":          alias,
             "Nationality":    nationality,
             "Designation":    designation,
             "Sanction Type":  sanction_type_str,
             "Source":         source
-        })
-
-    return records
+        }
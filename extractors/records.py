@@ -0,0 +1,17 @@
+# Field names shared by every source that loads into sanctioned_entities
+UNIFIED_FIELDNAMES = ["Name", "Alias", "Nationality", "Designation", "Sanction Type", "Source"]
+
+
+def record_parser(fieldnames):
+    """
+    Marks a parser as following the record-stream protocol:
+
+    - it is called as `parser(file_path, source)` and yields one dict per record,
+    - every record has exactly the keys listed in `fieldnames`, which are exposed
+      up front as `parser.fieldnames` so the output can be written before the
+      first record is produced.
+    """
+    def decorate(parser_fn):
+        parser_fn.fieldnames = list(fieldnames)
+        return parser_fn
+    return decorate
@@ -1,23 +1,28 @@
-import xml.etree.ElementTree as ET
+from extractors.records import UNIFIED_FIELDNAMES, record_parser
+from extractors.xml_stream import iter_elements
 
-def parse_swiss(xml_data: str, source: str):
+@record_parser(UNIFIED_FIELDNAMES)
+def parse_swiss(xml_source, source: str):
     """
     Parses the Swiss Sanctions List into the unified schema:
     Name, Alias, Nationality, Designation, Sanction Type, Source
-    """
-    root = ET.fromstring(xml_data)
-    records = []
 
-    # Build a mapping from sanctions-set-id to designation (sanction type)
+    The SECO schema lists every <sanctions-program> before the first <target>,
+    so the sanctions-set mapping is complete by the time targets are streamed.
+    """
+    # Mapping from sanctions-set-id to designation (sanction type)
     ssid_to_designation = {}
-    for prog in root.findall('sanctions-program'):
-        for sset in prog.findall('sanctions-set'):
-            ssid = sset.attrib.get('ssid')
-            designation = sset.text.strip() if sset.text else ''
-            ssid_to_designation[ssid] = designation
 
-    # Parse each target (person/organization)
-    for target in root.findall('target'):
+    for element in iter_elements(xml_source, ('sanctions-program', 'target'), depth=1):
+        if element.tag == 'sanctions-program':
+            for sset in element.findall('sanctions-set'):
+                ssid = sset.attrib.get('ssid')
+                designation = sset.text.strip() if sset.text else ''
+                ssid_to_designation[ssid] = designation
+            continue
+
+        # Parse each target (person/organization)
+        target = element
         name = ''
         aliases = []
         nationalities = []
@@ -60,14 +65,11 @@ def parse_swiss(xml_data: str, source: str):
         if not alias_str:
             alias_str = None
 
-        # Append record
-        records.append({
+        yield {
             'Name': name if name else None,
             'Alias': alias_str,
             'Nationality': ', '.join(nationalities) if nationalities else None,
             'Designation': designation,
             'Sanction Type': 'Individual',
             'Source': source
-        })
-
-    return records
\ No newline at end of file
+        }
@@ -1,6 +1,8 @@
-import xml.etree.ElementTree as ET
+from extractors.records import UNIFIED_FIELDNAMES, record_parser
+from extractors.xml_stream import iter_elements
 
-def parse_uk(xml_data: str, source: str):
+@record_parser(UNIFIED_FIELDNAMES)
+def parse_uk(xml_source, source: str):
     """
     Parses the UK Sanctions List into a unified schema:
     Name, Alias, Nationality, Designation, Sanction Type, Source.
@@ -8,10 +10,7 @@ def parse_uk(xml_data: str, source: str):
     - Keeps 'Alias' key as None if missing.
     - Skips rows where 'Nationality' is missing.
     """
-    root = ET.fromstring(xml_data)
-    results = []
-
-    for designation in root.findall('Designation'):
+    for designation in iter_elements(xml_source, ('Designation',), depth=1):
         # --- Names ---
         name = None
         aliases = []
@@ -56,7 +55,7 @@ def parse_uk(xml_data: str, source: str):
         raw_sanctions = (designation.findtext('SanctionsImposed') or '').strip()
         sanctions_imposed = ', '.join([s.strip() for s in raw_sanctions.split('|') if s.strip()]) or None
 
-        entry = {
+        yield {
             "Name": name or None,
             "Alias": alias_str,
             "Nationality": nationality_str,
@@ -64,7 +63,3 @@ def parse_uk(xml_data: str, source: str):
             "Sanction Type": sanction_type or sanctions_imposed,
             "Source": source
         }
-
-        results.append(entry)
-
-    return results
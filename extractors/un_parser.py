@@ -1,5 +1,6 @@
-import xml.etree.ElementTree as ET
 import re
+from extractors.records import UNIFIED_FIELDNAMES, record_parser
+from extractors.xml_stream import iter_elements
 
 def clean_text(text):
     """
@@ -21,68 +22,74 @@ def clean_text(text):
     return text
 
 
-def parse_un(xml_data: str, source: str):
+@record_parser(UNIFIED_FIELDNAMES)
+def parse_un(xml_source, source: str):
     """
     Parses the UN Sanctions List (both individuals and entities) into unified flat records.
+
+    Streams the document with a pull parser: `xml_source` is a file path or binary stream
+    (raw XML text is still accepted), and each record is yielded as soon as its
+    INDIVIDUAL/ENTITY element closes, so the full tree is never held in memory.
     """
-    root = ET.fromstring(xml_data)
-    records = []
-
-    # Handle INDIVIDUALS
-    for individual in root.findall('.//INDIVIDUAL'):
-        first = clean_text(individual.findtext('FIRST_NAME', ''))
-        second = clean_text(individual.findtext('SECOND_NAME', ''))
-        third = clean_text(individual.findtext('THIRD_NAME', ''))
-
-        full_name = ' '.join(filter(None, [first, second, third])) or 'Unknown'
-
-        alias = None
-        alias_elements = individual.findall('INDIVIDUAL_ALIAS')
-        if alias_elements:
-            raw_alias = alias_elements[0].findtext('ALIAS_NAME')
-            alias = clean_text(raw_alias)
-
-        nationality_elements = individual.findall('NATIONALITY/VALUE')
-        nationality = clean_text(nationality_elements[0].text) if nationality_elements else 'Unknown'
-
-        designation_elements = individual.findall('DESIGNATION/VALUE')
-        designation = clean_text(designation_elements[0].text) if designation_elements else 'individual'
-
-        sanction_type = clean_text(individual.findtext('UN_LIST_TYPE', 'Unknown'))
-
-        records.append({
-            "Name": full_name,
-            "Alias": alias,
-            "Nationality": nationality,
-            "Designation": designation,
-            "Sanction Type": sanction_type,
-            "Source": source
-        })
-
-    # Handle ENTITIES
-    for entity in root.findall('.//ENTITY'):
-        name = clean_text(entity.findtext('FIRST_NAME', 'Unknown')) or 'Unknown'
-
-        alias = None
-        alias_elements = entity.findall('ENTITY_ALIAS')
-        if alias_elements:
-            raw_alias = alias_elements[0].findtext('ALIAS_NAME')
-            alias = clean_text(raw_alias)
-
-        nationality_elements = entity.findall('NATIONALITY/VALUE')
-        nationality = clean_text(nationality_elements[0].text) if nationality_elements else 'Unknown'
-
-        designation = 'entity'
-
-        sanction_type = clean_text(entity.findtext('UN_LIST_TYPE', 'Unknown'))
-
-        records.append({
-            "Name": name,
-            "Alias": alias,
-            "Nationality": nationality,
-            "Designation": designation,
-            "Sanction Type": sanction_type,
-            "Source": source
-        })
-
-    return records
+    for element in iter_elements(xml_source, ('INDIVIDUAL', 'ENTITY')):
+        if element.tag == 'INDIVIDUAL':
+            yield _parse_individual(element, source)
+        else:
+            yield _parse_entity(element, source)
+
+
+def _parse_individual(individual, source):
+    first = clean_text(individual.findtext('FIRST_NAME', ''))
+    second = clean_text(individual.findtext('SECOND_NAME', ''))
+    third = clean_text(individual.findtext('THIRD_NAME', ''))
+
+    full_name = ' '.join(filter(None, [first, second, third])) or 'Unknown'
+
+    alias = None
+    alias_elements = individual.findall('INDIVIDUAL_ALIAS')
+    if alias_elements:
+        raw_alias = alias_elements[0].findtext('ALIAS_NAME')
+        alias = clean_text(raw_alias)
+
+    nationality_elements = individual.findall('NATIONALITY/VALUE')
+    nationality = clean_text(nationality_elements[0].text) if nationality_elements else 'Unknown'
+
+    designation_elements = individual.findall('DESIGNATION/VALUE')
+    designation = clean_text(designation_elements[0].text) if designation_elements else 'individual'
+
+    sanction_type = clean_text(individual.findtext('UN_LIST_TYPE', 'Unknown'))
+
+    return {
+        "Name": full_name,
+        "Alias": alias,
+        "Nationality": nationality,
+        "Designation": designation,
+        "Sanction Type": sanction_type,
+        "Source": source
+    }
+
+
+def _parse_entity(entity, source):
+    name = clean_text(entity.findtext('FIRST_NAME', 'Unknown')) or 'Unknown'
+
+    alias = None
+    alias_elements = entity.findall('ENTITY_ALIAS')
+    if alias_elements:
+        raw_alias = alias_elements[0].findtext('ALIAS_NAME')
+        alias = clean_text(raw_alias)
+
+    nationality_elements = entity.findall('NATIONALITY/VALUE')
+    nationality = clean_text(nationality_elements[0].text) if nationality_elements else 'Unknown'
+
+    designation = 'entity'
+
+    sanction_type = clean_text(entity.findtext('UN_LIST_TYPE', 'Unknown'))
+
+    return {
+        "Name": name,
+        "Alias": alias,
+        "Nationality": nationality,
+        "Designation": designation,
+        "Sanction Type": sanction_type,
+        "Source": source
+    }
@@ -0,0 +1,83 @@
+import xml.etree.ElementTree as ET
+
+CHUNK_SIZE = 64 * 1024
+
+
+def local_name(tag):
+    """Returns the tag without its '{namespace}' prefix."""
+    return tag.rpartition('}')[2]
+
+
+def namespace(tag):
+    """Returns the namespace URI of a '{namespace}tag' string, or '' if there is none."""
+    return tag[1:tag.find('}')] if tag.startswith('{') else ''
+
+
+def _iter_chunks(xml_source):
+    # Raw XML text/bytes are still accepted so callers holding a document in memory keep working
+    if isinstance(xml_source, (bytes, bytearray)) or (
+        isinstance(xml_source, str) and xml_source.lstrip().startswith('<')
+    ):
+        for start in range(0, len(xml_source), CHUNK_SIZE):
+            yield xml_source[start:start + CHUNK_SIZE]
+        return
+
+    if hasattr(xml_source, 'read'):
+        while True:
+            chunk = xml_source.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    with open(xml_source, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_elements(xml_source, tags, depth=None, with_root=False):
+    """
+    Streams an XML document and yields every element whose local tag name is in `tags`
+    as soon as its end tag has been parsed.
+
+    - `xml_source` can be a file path, a binary stream or the raw XML text/bytes.
+    - `depth` limits matches to that nesting level (1 = direct children of the root);
+      None matches at any level, like './/TAG'.
+    - `with_root` yields (root, element) pairs instead, the root being the document
+      element as opened by its start tag (attributes and namespace, no children kept).
+    - Once the caller moves on, the element is cleared and detached from its parent,
+      so memory stays flat regardless of the document size.
+    """
+    tags = set(tags)
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    stack = []
+
+    def drain():
+        for event, elem in parser.read_events():
+            if event == 'start':
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            if local_name(elem.tag) not in tags:
+                continue
+            if depth is not None and len(stack) != depth:
+                continue
+
+            if with_root:
+                yield (stack[0] if stack else elem), elem
+            else:
+                yield elem
+
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
+
+    for chunk in _iter_chunks(xml_source):
+        parser.feed(chunk)
+        yield from drain()
+
+    parser.close()
+    yield from drain()
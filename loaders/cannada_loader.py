@@ -1,50 +1,80 @@
-from utils.db_connection import get_connection
+from utils.db_connection import pooled_connection
+from loaders.common_loader import BULK_BATCH_SIZE, fold, iter_batches
 
 def insert_cannada_data(data):
     if not data:
         print(" No data to insert")
         return
 
-    conn = get_connection()
-    if not conn:
-        print(" Could not get database connection")
-        return
+    try:
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                # Duplicates (same name, nationalities, date_of_listing) are skipped by the unique key
+                insert_query = """
+                    INSERT IGNORE INTO cannada_tbl (name, nationalities, date_of_listing, source)
+                    VALUES (%s, %s, %s, %s)
+                """
+
+                for row in data:
+                    name = row.get('name')
+                    nationalities = row.get('nationalities')
+                    date_of_listing = row.get('date_of_listing') or None
+                    source = row.get('source') or 'Canada'
+
+                    # Skip if required fields are missing
+                    if not name or not nationalities:
+                        print(f" Skipping incomplete record: {row}")
+                        continue
+
+                    if not cursor.execute(insert_query, (name, nationalities, date_of_listing, source)):
+                        print(f" Duplicate skipped: {name}")
+
+            conn.commit()
+            print(" Canada data inserted successfully (duplicates skipped)")
 
+    except Exception as e:
+        print(f" Error inserting Canada data: {e}")
+        raise
+
+
+def insert_cannada_data_bulk(data, batch_size=BULK_BATCH_SIZE):
+    """
+    Batched version of insert_cannada_data: same resulting rows, one INSERT IGNORE
+    executemany per batch, duplicates within the file dropped in memory first.
+    """
     try:
-        with conn.cursor() as cursor:
-            select_query = """
-                SELECT entity_id FROM cannada_tbl 
-                WHERE name = %s AND nationalities = %s AND date_of_listing = %s
-            """
-            insert_query = """
-                INSERT INTO cannada_tbl (name, nationalities, date_of_listing, source)
-                VALUES (%s, %s, %s, %s)
-            """
-
-            for row in data:
-                name = row.get('name')
-                nationalities = row.get('nationalities')
-                date_of_listing = row.get('date_of_listing') or None
-                source = row.get('source') or 'Canada'
-
-                # Skip if required fields are missing
-                if not name or not nationalities:
-                    print(f" Skipping incomplete record: {row}")
-                    continue
-
-                # Duplication check
-                cursor.execute(select_query, (name, nationalities, date_of_listing))
-                if cursor.fetchone():
-                    print(f" Duplicate skipped: {name}")
-                    continue
-
-                cursor.execute(insert_query, (name, nationalities, date_of_listing, source))
-
-        conn.commit()
-        print(" Canada data inserted successfully (duplicates skipped)")
+        with pooled_connection() as conn:
+            row_count = skipped = inserted = 0
+            seen = set()
+            with conn.cursor() as cursor:
+                for batch in iter_batches(data, batch_size):
+                    values = []
+                    for row in batch:
+                        row_count += 1
+                        name = row.get('name')
+                        nationalities = row.get('nationalities')
+                        date_of_listing = row.get('date_of_listing') or None
+                        if not name or not nationalities:
+                            skipped += 1
+                            continue
+                        # A NULL date never matches in the unique key, so only dated rows can be duplicates
+                        if date_of_listing is not None:
+                            key = (fold(name), fold(nationalities), date_of_listing)
+                            if key in seen:
+                                continue
+                            seen.add(key)
+                        values.append((name, nationalities, date_of_listing, row.get('source') or 'Canada'))
+                    if values:
+                        inserted += cursor.executemany(
+                            "INSERT IGNORE INTO cannada_tbl (name, nationalities, date_of_listing, source) "
+                            "VALUES (%s, %s, %s, %s)",
+                            values
+                        )
+
+            conn.commit()
+            print(f"✅ Canada bulk loaded {row_count} rows ({inserted} new, "
+                  f"{row_count - skipped - inserted} duplicates, {skipped} incomplete skipped).")
 
     except Exception as e:
         print(f" Error inserting Canada data: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+        raise
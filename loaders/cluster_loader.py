@@ -0,0 +1,53 @@
+"""
+Database side of entity resolution (etl/resolve.py): reads the listed common-schema
+entities with their aliases and nationalities, and replaces the entity_clusters table.
+"""
+from utils.db_connection import pooled_connection
+from loaders.common_loader import BULK_BATCH_SIZE, iter_batches
+
+
+def fetch_resolution_records():
+    """Returns [{"id", "name", "source", "aliases", "nationalities"}] for every listed entity."""
+    try:
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT entity_id, name, source FROM sanctioned_entities "
+                    "WHERE delisted_at IS NULL AND name IS NOT NULL ORDER BY entity_id"
+                )
+                records = {
+                    entity_id: {"id": entity_id, "name": name, "source": source, "aliases": [], "nationalities": []}
+                    for entity_id, name, source in cursor.fetchall()
+                }
+                for table, column, field in [("aliases", "alias_name", "aliases"),
+                                             ("nationalities", "nationality", "nationalities")]:
+                    cursor.execute(
+                        f"SELECT c.entity_id, c.{column} FROM {table} c "
+                        "JOIN sanctioned_entities e ON e.entity_id = c.entity_id WHERE e.delisted_at IS NULL"
+                    )
+                    for entity_id, value in cursor.fetchall():
+                        if entity_id in records:
+                            records[entity_id][field].append(value)
+        return list(records.values())
+
+    except Exception as e:
+        print(f"❌ Failed to read entities for resolution: {e}")
+        raise
+
+
+def write_clusters(rows, batch_size=BULK_BATCH_SIZE):
+    """Replaces entity_clusters with `rows` of (entity_id, cluster_id, score) in one transaction."""
+    try:
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM entity_clusters")
+                for batch in iter_batches(rows, batch_size):
+                    cursor.executemany(
+                        "INSERT INTO entity_clusters (entity_id, cluster_id, score) VALUES (%s, %s, %s)",
+                        batch
+                    )
+            conn.commit()
+
+    except Exception as e:
+        print(f"❌ Failed to write entity clusters: {e}")
+        raise
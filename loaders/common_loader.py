@@ -1,102 +1,289 @@
-from utils.db_connection import get_connection
-
-def safe_parse_list(val):
-    """Ensure the value is a list; if it's a string, split by commas; if None, return empty list."""
-    if not val:
-        return []
-    if isinstance(val, list):
-        return val
-    if isinstance(val, str):
-        return [item.strip() for item in val.split(",") if item.strip()]
-    return []
+from contextlib import contextmanager
+
+from utils.artifacts import safe_parse_list
+from utils.db_connection import pooled_connection
+
+# Writers of the common tables hold one of WRITE_LOCK_SLOTS named locks until they commit.
+# A full reload (loaders/reload_loader.py) holds all of them, so nothing is written to the
+# live tables between its copy and its RENAME, while ordinary loads still run side by side.
+WRITE_LOCK = "sanction_db_write"
+WRITE_LOCK_SLOTS = 8
+WRITE_LOCK_TIMEOUT = 600
+
+def _get_lock(cursor, name, timeout):
+    cursor.execute("SELECT GET_LOCK(%s, %s)", (name, timeout))
+    return cursor.fetchone()[0] == 1
+
+@contextmanager
+def common_write_lock(cursor, exclusive=False):
+    """Holds a slot of the common tables' write lock (all slots with `exclusive`) on the cursor's session."""
+    names = [f"{WRITE_LOCK}_{slot}" for slot in range(WRITE_LOCK_SLOTS)]
+    held = []
+    try:
+        if exclusive:
+            for name in names:
+                if not _get_lock(cursor, name, WRITE_LOCK_TIMEOUT):
+                    raise RuntimeError("Timed out waiting for the common tables write lock")
+                held.append(name)
+        else:
+            free = next((name for name in names if _get_lock(cursor, name, 0)), None)
+            if free is None:
+                # Every slot is taken, most likely by a reload: wait for it
+                if not _get_lock(cursor, names[0], WRITE_LOCK_TIMEOUT):
+                    raise RuntimeError("Timed out waiting for the common tables write lock")
+                free = names[0]
+            held.append(free)
+        yield
+    finally:
+        for name in held:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (name,))
 
 def insert_common_data(data):
     if not data:
         print("⚠️ No data to insert.")
         return
 
-    conn = get_connection()
-    if not conn:
-        print("❌ Could not get DB connection.")
-        return
-
     try:
-        with conn.cursor() as cursor:
-            for row in data:
-                name = row.get("Name")
-                designation = row.get("Designation")
-                source = row.get("Source")
-
-                aliases = safe_parse_list(row.get("Alias"))
-                nationalities = safe_parse_list(row.get("Nationality"))
-                sanction_types = safe_parse_list(row.get("Sanction Type"))
-
-                # print(f"Inserting entity: Name={name}, Designation={designation}, Source={source}")
-                # print(f"Aliases: {aliases}")
-                # print(f"Nationalities: {nationalities}")
-                # print(f"Sanction Types: {sanction_types}")
-
-                # Check if entity already exists (by name + source)
-                cursor.execute(
-                    "SELECT entity_id FROM sanctioned_entities WHERE name=%s AND source=%s",
-                    (name, source)
-                )
-                result = cursor.fetchone()
-
-                if result:
-                    entity_id = result[0]
-                else:
-                    # Insert new entity
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor, common_write_lock(cursor):
+                for row in data:
+                    name = row.get("Name")
+                    designation = row.get("Designation")
+                    source = row.get("Source")
+
+                    aliases = safe_parse_list(row.get("Alias"))
+                    nationalities = safe_parse_list(row.get("Nationality"))
+                    sanction_types = safe_parse_list(row.get("Sanction Type"))
+
+                    # print(f"Inserting entity: Name={name}, Designation={designation}, Source={source}")
+                    # print(f"Aliases: {aliases}")
+                    # print(f"Nationalities: {nationalities}")
+                    # print(f"Sanction Types: {sanction_types}")
+
+                    # Insert the entity, or get the id of the existing one (unique name + source)
                     cursor.execute(
-                        "INSERT INTO sanctioned_entities (name, designation, source) VALUES (%s, %s, %s)",
+                        "INSERT INTO sanctioned_entities (name, designation, source) VALUES (%s, %s, %s) "
+                        "ON DUPLICATE KEY UPDATE entity_id = LAST_INSERT_ID(entity_id)",
                         (name, designation, source)
                     )
                     entity_id = cursor.lastrowid
 
-                # Insert aliases (avoid duplicates)
-                for alias in aliases:
-                    cursor.execute(
-                        "SELECT alias_id FROM aliases WHERE entity_id=%s AND alias_name=%s",
-                        (entity_id, alias)
-                    )
-                    if not cursor.fetchone():
+                    # Insert aliases (duplicates skipped by the unique key)
+                    for alias in aliases:
                         cursor.execute(
-                            "INSERT INTO aliases (entity_id, alias_name) VALUES (%s, %s)",
+                            "INSERT IGNORE INTO aliases (entity_id, alias_name) VALUES (%s, %s)",
                             (entity_id, alias)
                         )
 
-                # Insert nationalities (avoid duplicates)
-                for nat in nationalities:
-                    cursor.execute(
-                        "SELECT nat_id FROM nationalities WHERE entity_id=%s AND nationality=%s",
-                        (entity_id, nat)
-                    )
-                    if not cursor.fetchone():
+                    # Insert nationalities (duplicates skipped by the unique key)
+                    for nat in nationalities:
                         cursor.execute(
-                            "INSERT INTO nationalities (entity_id, nationality) VALUES (%s, %s)",
+                            "INSERT IGNORE INTO nationalities (entity_id, nationality) VALUES (%s, %s)",
                             (entity_id, nat)
                         )
 
-                # Insert sanction types (avoid duplicates)
-                for stype in sanction_types:
-                    cursor.execute(
-                        "SELECT type_id FROM sanction_types WHERE entity_id=%s AND sanction_type=%s",
-                        (entity_id, stype)
-                    )
-                    if not cursor.fetchone():
+                    # Insert sanction types (duplicates skipped by the unique key)
+                    for stype in sanction_types:
                         cursor.execute(
-                            "INSERT INTO sanction_types (entity_id, sanction_type) VALUES (%s, %s)",
+                            "INSERT IGNORE INTO sanction_types (entity_id, sanction_type) VALUES (%s, %s)",
                             (entity_id, stype)
                         )
 
-        conn.commit()
-        print("✅ Data inserted/updated successfully.")
+                conn.commit()
+            print("✅ Data inserted/updated successfully.")
 
     except Exception as e:
         print(f"❌ Failed to insert common data: {e}")
+        raise
 
-    finally:
-        conn.close()
+
+# Rows handled per round of bulk statements
+BULK_BATCH_SIZE = 1000
+
+# (table, value column, CSV field) for every child table of sanctioned_entities
+CHILD_TABLES = [
+    ("aliases", "alias_name", "Alias"),
+    ("nationalities", "nationality", "Nationality"),
+    ("sanction_types", "sanction_type", "Sanction Type"),
+]
+
+def fold(value):
+    """Dedup key for a name/value, case-insensitive like the tables' default collation."""
+    return value.casefold() if isinstance(value, str) else value
+
+def iter_batches(data, batch_size):
+    batch = []
+    for row in data:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def placeholders(count):
+    return ", ".join(["%s"] * count)
+
+def fetch_entity_ids(cursor, keys):
+    """Returns {(fold(name), fold(source)): entity_id} for the given (name, source) pairs, one SELECT per source."""
+    by_source = {}
+    for name, source in keys:
+        by_source.setdefault(source, []).append(name)
+
+    ids = {}
+    for source, names in by_source.items():
+        cursor.execute(
+            f"SELECT name, entity_id FROM sanctioned_entities WHERE source=%s AND name IN ({placeholders(len(names))}) "
+            "ORDER BY entity_id",
+            [source, *names]
+        )
+        for name, entity_id in cursor.fetchall():
+            ids.setdefault((fold(name), fold(source)), entity_id)
+    return ids
+
+def fetch_entity_id(cursor, name, source):
+    """
+    Id of the stored entity MySQL considers equal to (name, source). Used when the stored
+    spelling differs in a way fold() does not cover (the collation also ignores accents),
+    so the readback of fetch_entity_ids missed it.
+    """
+    cursor.execute(
+        "SELECT entity_id FROM sanctioned_entities WHERE name=%s AND source<=>%s ORDER BY entity_id LIMIT 1",
+        (name, source)
+    )
+    found = cursor.fetchone()
+    return found[0] if found else None
+
+class EntityIdentityMap:
+    """
+    In-memory copy of what already exists for the sources being loaded: (name, source) -> entity_id
+    and the (entity_id, value) pairs of every child table. Each source is read with one query per
+    table the first time it is seen; after that every dedup decision is a dict/set lookup.
+    """
+
+    def __init__(self):
+        self.entity_ids = {}
+        self.child_values = {table: set() for table, _, _ in CHILD_TABLES}
+        self.sources = set()
+
+    def preload(self, cursor, source):
+        if fold(source) in self.sources:
+            return
+        self.sources.add(fold(source))
+
+        cursor.execute(
+            "SELECT name, entity_id FROM sanctioned_entities WHERE source=%s ORDER BY entity_id",
+            (source,)
+        )
+        for name, entity_id in cursor.fetchall():
+            self.entity_ids.setdefault((fold(name), fold(source)), entity_id)
+
+        for table, column, _ in CHILD_TABLES:
+            cursor.execute(
+                f"SELECT c.entity_id, c.{column} FROM {table} c "
+                "JOIN sanctioned_entities e ON e.entity_id = c.entity_id WHERE e.source=%s",
+                (source,)
+            )
+            self.child_values[table].update((entity_id, fold(value)) for entity_id, value in cursor.fetchall())
+
+def insert_entity_batch(cursor, rows, identity_map=None):
+    """
+    Set-based equivalent of the per-row loop in insert_common_data for one batch of rows:
+    entities and each child table are written with one INSERT IGNORE executemany, and the
+    entity ids are read back with one SELECT. With an `identity_map`, rows that already exist
+    are skipped in memory first, so only new rows cost database round trips.
+    """
+    # 1) Entities, deduplicated by (name, source); the first row's designation wins
+    entities = {}
+    unnamed = []
+    for row in rows:
+        name, source = row.get("Name"), row.get("Source")
+        if name is None:
+            # NULL never matches an existing name, so every such row is its own entity
+            unnamed.append(row)
+            continue
+        entities.setdefault((fold(name), fold(source)), (name, row.get("Designation"), source))
+
+    if identity_map is None:
+        ids = {}
+    else:
+        for _, _, source in entities.values():
+            identity_map.preload(cursor, source)
+        ids = identity_map.entity_ids
+
+    new_entities = [values for key, values in entities.items() if key not in ids]
+    inserted = 0
+    if new_entities:
+        # The unique (name, source) key skips entities that already exist
+        cursor.executemany(
+            "INSERT IGNORE INTO sanctioned_entities (name, designation, source) VALUES (%s, %s, %s)",
+            new_entities
+        )
+        inserted = cursor.rowcount
+        ids.update(fetch_entity_ids(cursor, [(name, source) for name, _, source in new_entities]))
+
+    row_ids = []
+    for row in rows:
+        if row.get("Name") is None:
+            cursor.execute(
+                "INSERT INTO sanctioned_entities (name, designation, source) VALUES (%s, %s, %s)",
+                (None, row.get("Designation"), row.get("Source"))
+            )
+            row_ids.append(cursor.lastrowid)
+        else:
+            key = (fold(row.get("Name")), fold(row.get("Source")))
+            if key not in ids:
+                ids[key] = fetch_entity_id(cursor, row.get("Name"), row.get("Source"))
+            row_ids.append(ids[key])
+
+    # 2) Child rows, skipping pairs that repeat within the batch (or are known to exist);
+    #    the unique (entity_id, value) keys skip the rest
+    for table, column, field in CHILD_TABLES:
+        existing = set() if identity_map is None else identity_map.child_values[table]
+        new_values = []
+        for entity_id, row in zip(row_ids, rows):
+            if entity_id is None:
+                continue
+            for value in safe_parse_list(row.get(field)):
+                key = (entity_id, fold(value))
+                if key not in existing:
+                    existing.add(key)
+                    new_values.append((entity_id, value))
+        if new_values:
+            cursor.executemany(
+                f"INSERT IGNORE INTO {table} (entity_id, {column}) VALUES (%s, %s)",
+                new_values
+            )
+
+    return inserted + len(unnamed)
+
+def insert_common_data_bulk(data, batch_size=BULK_BATCH_SIZE, preload=False):
+    """
+    Bulk version of insert_common_data: same resulting rows, but a handful of
+    statements per batch of `batch_size` rows instead of several per row.
+
+    With `preload`, the existing rows of each source are read once up front
+    (EntityIdentityMap), so round trips scale with the number of new rows.
+    """
+    if not data:
+        print("⚠️ No data to insert.")
+        return
+
+    try:
+        with pooled_connection() as conn:
+            row_count = 0
+            new_entities = 0
+            identity_map = EntityIdentityMap() if preload else None
+            with conn.cursor() as cursor, common_write_lock(cursor):
+                for batch in iter_batches(data, batch_size):
+                    new_entities += insert_entity_batch(cursor, batch, identity_map)
+                    row_count += len(batch)
+                conn.commit()
+            print(f"✅ Bulk loaded {row_count} rows ({new_entities} new entities).")
+
+    except Exception as e:
+        print(f"❌ Failed to bulk insert common data: {e}")
+        raise
 
 
 # import pymysql
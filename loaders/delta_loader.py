@@ -0,0 +1,105 @@
+"""
+Applies the parts of a delta (see etl/delta.py) that the insert loaders cannot express:
+delisting removed records, re-listing records that came back, and clearing the child
+rows / updating the columns of changed records before they are re-inserted.
+"""
+from contextlib import nullcontext
+
+from utils.db_connection import pooled_connection
+from loaders.common_loader import common_write_lock
+from loaders.load_to_db import COMMON_PARSER_KEYS
+
+# How the records of each schema are identified in the database:
+#   table     - parent table that gets delisted_at
+#   key       - (record field, column) pairs of its unique key
+#   children  - tables hanging off table.entity_id, rebuilt for changed records
+#   updates   - (record field, column) pairs overwritten for changed records
+#   empty_as_null - key fields the loader stores as NULL when empty
+DELTA_TABLES = {
+    "common": {
+        "table": "sanctioned_entities",
+        "key": [("Name", "name"), ("Source", "source")],
+        "children": ["aliases", "nationalities", "sanction_types"],
+        "updates": [("Designation", "designation")],
+    },
+    "can": {
+        "table": "cannada_tbl",
+        "key": [("name", "name"), ("nationalities", "nationalities"), ("date_of_listing", "date_of_listing")],
+        "children": [],
+        "updates": [],
+        "empty_as_null": ["date_of_listing"],
+    },
+    "interpol": {
+        "table": "interpol_tbl",
+        "key": [("Name", "name"), ("Age", "age")],
+        "children": ["interpol_nationality"],
+        "updates": [],
+    },
+}
+
+
+def delta_spec(parser_key):
+    """Returns the DELTA_TABLES entry for a parser key, or None if it has no delta support."""
+    return DELTA_TABLES.get("common" if parser_key in COMMON_PARSER_KEYS else parser_key)
+
+
+def key_params(spec, row):
+    """Values of the key columns as the loaders write them."""
+    empty_as_null = spec.get("empty_as_null", [])
+    return [(row.get(field) or None) if field in empty_as_null else row.get(field) for field, _ in spec["key"]]
+
+
+def _where_key(spec, alias=""):
+    # <=> so NULL key parts (e.g. a missing date_of_listing) still match
+    return " AND ".join(f"{alias}{column} <=> %s" for _, column in spec["key"])
+
+
+def _write_lock(parser_key, cursor):
+    # The common tables are shared with LOAD_MODE=reload, which must not swap them out mid-delta
+    return common_write_lock(cursor) if parser_key in COMMON_PARSER_KEYS else nullcontext()
+
+
+def apply_delta_changes(parser_key, manifest):
+    """
+    Marks removed keys delisted, clears delisted_at on keys that reappeared, and for
+    changed keys updates their columns and deletes their child rows, so the following
+    insert of the delta records rebuilds them. Everything runs in one transaction;
+    every step is idempotent, so a failed run can simply be applied again.
+    """
+    spec = delta_spec(parser_key)
+    table = spec["table"]
+    removed = manifest["removed"]
+    relisted = manifest["relisted"]
+    changed = manifest["changed"]
+    if not (removed or relisted or changed):
+        return
+
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor, _write_lock(parser_key, cursor):
+            if removed:
+                cursor.executemany(
+                    f"UPDATE {table} SET delisted_at = NOW() WHERE {_where_key(spec)} AND delisted_at IS NULL",
+                    removed
+                )
+            if relisted:
+                cursor.executemany(
+                    f"UPDATE {table} SET delisted_at = NULL WHERE {_where_key(spec)} AND delisted_at IS NOT NULL",
+                    relisted
+                )
+
+            for change in changed:
+                if spec["updates"]:
+                    assignments = ", ".join(f"{column} = %s" for _, column in spec["updates"])
+                    cursor.execute(
+                        f"UPDATE {table} SET {assignments} WHERE {_where_key(spec)}",
+                        [*change["updates"], *change["key"]]
+                    )
+                for child in spec["children"]:
+                    cursor.execute(
+                        f"DELETE c FROM {child} c JOIN {table} p ON p.entity_id = c.entity_id "
+                        f"WHERE {_where_key(spec, 'p.')}",
+                        change["key"]
+                    )
+            conn.commit()
+
+    print(f"✅ Delta applied to {table}: {len(removed)} delisted, {len(relisted)} relisted, {len(changed)} changed")
@@ -1,4 +1,5 @@
-from utils.db_connection import get_connection
+from utils.db_connection import pooled_connection
+from loaders.common_loader import BULK_BATCH_SIZE, fold, iter_batches, placeholders, safe_parse_list
 import pymysql
 
 def insert_interpol_data(data):
@@ -6,73 +7,149 @@ def insert_interpol_data(data):
         print("No data to insert")
         return
 
-    conn = get_connection()
-    if not conn:
-        print("Could not get DB connection")
-        return
-
     try:
-        with conn.cursor() as cursor:
-            for row in data:
-                name = row.get("Name")
-                age = row.get("Age")
-                nationalities = row.get("Nationality")
-
-                if not (name):
-                    print(f"⚠️ Skipping incomplete row: {row}")
-                    continue
-
-                # Convert age to integer
-                try:
-                    if age is None or age == '':
+        with pooled_connection() as conn:
+            with conn.cursor() as cursor:
+                for row in data:
+                    name = row.get("Name")
+                    age = row.get("Age")
+                    nationalities = row.get("Nationality")
+
+                    if not (name):
+                        print(f"⚠️ Skipping incomplete row: {row}")
                         continue
-                    else:
-                        age = int(age)
-                except ValueError:
-                    print(f"⚠️ Invalid age for {name},(age = {age}),skipping")
-                    continue
-
-                # Check for duplicate in interpol_tbl
-                cursor.execute(
-                    "SELECT entity_id FROM interpol_tbl WHERE name=%s AND age=%s",
-                    (name, age)
-                )
-                existing = cursor.fetchone()
-                if existing:
-                    entity_id = existing[0]
-                    print(f"⚠️ Duplicate found for {name}, using existing entity_id: {entity_id}")
-                else:
-                    # Insert into interpol_tbl
-                    cursor.execute(
-                        "INSERT INTO interpol_tbl (name, age) VALUES (%s, %s)",
+
+                    # Convert age to integer
+                    try:
+                        if age is None or age == '':
+                            continue
+                        else:
+                            age = int(age)
+                    except ValueError:
+                        print(f"⚠️ Invalid age for {name},(age = {age}),skipping")
+                        continue
+
+                    # Insert into interpol_tbl, or get the id of the existing (name, age) row
+                    inserted = cursor.execute(
+                        "INSERT INTO interpol_tbl (name, age) VALUES (%s, %s) "
+                        "ON DUPLICATE KEY UPDATE entity_id = LAST_INSERT_ID(entity_id)",
                         (name, age)
                     )
                     entity_id = cursor.lastrowid
-                    print(f"Processing: name={name}, age={age}, nationalities={nationalities}")
+                    if inserted == 1:
+                        print(f"Processing: name={name}, age={age}, nationalities={nationalities}")
+                    else:
+                        print(f"⚠️ Duplicate found for {name}, using existing entity_id: {entity_id}")
 
 
-                # Handle nationalities (can be comma-separated)
-                for nationality in nationalities.split(','):
-                    nationality = nationality.strip()
-                    if not nationality:
-                        continue
-                    # Check if nationality already exists for that entity
-                    cursor.execute(
-                        "SELECT 1 FROM interpol_nationality WHERE entity_id=%s AND nationality=%s",
-                        (entity_id, nationality)
-                    )
-                    if cursor.fetchone():
+                    # Handle nationalities (can be comma-separated)
+                    for nationality in nationalities.split(','):
+                        nationality = nationality.strip()
+                        if not nationality:
+                            continue
+                        # Insert into interpol_nationality (existing pairs skipped by the unique key)
+                        if cursor.execute(
+                            "INSERT IGNORE INTO interpol_nationality (entity_id, nationality) VALUES (%s, %s)",
+                            (entity_id, nationality)
+                        ):
+                            print(f"   ✅ Added nationality '{nationality}' for {name}")
+
+            conn.commit()
+            print("✅ Interpol data inserted successfully.")
+
+    except pymysql.MySQLError as e:
+        print(f"❌ Error inserting Interpol data: {e}")
+        raise
+
+
+def fetch_interpol_ids(cursor, names):
+    """Returns {(fold(name), age): entity_id} for every stored row with one of `names`."""
+    cursor.execute(
+        f"SELECT name, age, entity_id FROM interpol_tbl WHERE name IN ({placeholders(len(names))}) "
+        "ORDER BY entity_id",
+        names
+    )
+    ids = {}
+    for name, age, entity_id in cursor.fetchall():
+        ids.setdefault((fold(name), age), entity_id)
+    return ids
+
+
+def fetch_interpol_id(cursor, name, age):
+    """
+    Id of the stored row MySQL considers equal to (name, age). Used when the stored
+    spelling differs from `name` in a way fold() does not cover (the collation also
+    ignores accents), so the readback of fetch_interpol_ids missed it.
+    """
+    cursor.execute(
+        "SELECT entity_id FROM interpol_tbl WHERE name = %s AND age = %s ORDER BY entity_id LIMIT 1",
+        (name, age)
+    )
+    found = cursor.fetchone()
+    return found[0] if found else None
+
+
+def insert_interpol_data_bulk(data, batch_size=BULK_BATCH_SIZE):
+    """
+    Batched version of insert_interpol_data: per batch, one INSERT IGNORE executemany for
+    the (name, age) rows, one SELECT to read their ids back and one executemany for the
+    nationalities, each deduplicated in memory first. Logs a summary instead of every row.
+    """
+    try:
+        with pooled_connection() as conn:
+            row_count = skipped = new_entities = new_nationalities = 0
+            seen_nationalities = set()
+            with conn.cursor() as cursor:
+                for batch in iter_batches(data, batch_size):
+                    rows = []
+                    for row in batch:
+                        row_count += 1
+                        name, age = row.get("Name"), row.get("Age")
+                        try:
+                            age = None if age is None or age == '' else int(age)
+                        except ValueError:
+                            age = None
+                        if not name or age is None:
+                            skipped += 1
+                            continue
+                        rows.append((name, age, row.get("Nationality")))
+
+                    if not rows:
                         continue
-                    # Insert into interpol_nationality
-                    cursor.execute(
-                        "INSERT INTO interpol_nationality (entity_id, nationality) VALUES (%s, %s)",
-                        (entity_id, nationality)
+
+                    # The unique (name, age) key skips people that already exist
+                    entities = {}
+                    for name, age, _ in rows:
+                        entities.setdefault((fold(name), age), (name, age))
+                    new_entities += cursor.executemany(
+                        "INSERT IGNORE INTO interpol_tbl (name, age) VALUES (%s, %s)",
+                        list(entities.values())
                     )
-                    print(f"   ✅ Added nationality '{nationality}' for {name}")
+                    ids = fetch_interpol_ids(cursor, list({name for name, _ in entities.values()}))
+
+                    nationalities = []
+                    for name, age, values in rows:
+                        entity_id = ids.get((fold(name), age))
+                        if entity_id is None:
+                            entity_id = ids[(fold(name), age)] = fetch_interpol_id(cursor, name, age)
+                        if entity_id is None:
+                            skipped += 1
+                            continue
+                        for nationality in safe_parse_list(values):
+                            key = (entity_id, fold(nationality))
+                            if key not in seen_nationalities:
+                                seen_nationalities.add(key)
+                                nationalities.append((entity_id, nationality))
+                    if nationalities:
+                        new_nationalities += cursor.executemany(
+                            "INSERT IGNORE INTO interpol_nationality (entity_id, nationality) VALUES (%s, %s)",
+                            nationalities
+                        )
+
+            conn.commit()
+            print(f"✅ Interpol bulk loaded {row_count} rows ({new_entities} new people, "
+                  f"{new_nationalities} new nationalities, {skipped} without name or valid age skipped).")
 
-        conn.commit()
-        print("✅ Interpol data inserted successfully.")
     except pymysql.MySQLError as e:
         print(f"❌ Error inserting Interpol data: {e}")
-    finally:
-        conn.close()
+        raise
@@ -1,53 +1,122 @@
-import csv
+import itertools
 import os
-from loaders.common_loader import insert_common_data
-from loaders.cannada_loader import insert_cannada_data
-from loaders.interpol_loader import insert_interpol_data
+from utils.artifacts import iter_records
+from loaders.common_loader import insert_common_data, insert_common_data_bulk
+from loaders.staging_loader import insert_common_data_staged
+from loaders.reload_loader import reload_common_data
+from loaders.cannada_loader import insert_cannada_data, insert_cannada_data_bulk
+from loaders.interpol_loader import insert_interpol_data, insert_interpol_data_bulk
+
+# How common-schema sources are written:
+#   "reload"  - full replace via shadow tables and an atomic RENAME TABLE, all common sources
+#               of a run at once (reload_parsed_data)
+#   "staging" - LOAD DATA LOCAL INFILE into temporary tables, merged in SQL (largest loads)
+#   "preload" - batched statements, existing rows read once per source and deduped in memory
+#   "bulk"    - batched statements, existing rows looked up with one SELECT per batch
+#   "row"     - one round trip per value (original loader)
+# Canada and Interpol use their row loader in "row" mode and their batched loader otherwise.
+LOAD_MODE = os.getenv("LOAD_MODE", "preload")
+
+# Sources that share the sanctioned_entities / aliases / nationalities / sanction_types schema
+COMMON_PARSER_KEYS = {"un", "uk", "ofac", "swiss", "sdn", "aus", "eur"}
+
+# Fields converted while reading, per parser key; empty values become None and
+# values that do not convert are passed on unchanged for the loader to reject
+FIELD_TYPES = {
+    "interpol": {"Age": int},
+}
+
+
+def typed_rows(rows, types):
+    for row in rows:
+        for field, convert in types.items():
+            value = row.get(field)
+            if value is None or value == "":
+                row[field] = None
+                continue
+            try:
+                row[field] = convert(value)
+            except ValueError:
+                pass
+        yield row
 
 
 def load_parsed_data(parser_key, csv_file_path):
     """
-    Loads cleaned CSV data and inserts it into the appropriate database table using the correct loader.
+    Loads cleaned data and inserts it into the appropriate database table using the correct loader.
 
     Args:
         parser_key (str): The short name/key of the parser (e.g., "un", "uk", "eur").
-        csv_file_path (str): Path to the cleaned CSV file.
+        csv_file_path (str): Path to the cleaned artifact (CSV, or Parquet when INTERMEDIATE_FORMAT=parquet).
+
+    Returns:
+        bool: True if the data was handed to a loader, False if there was nothing to load.
+        Database errors are raised so the caller can retry or report them.
     """
     if not os.path.exists(csv_file_path):
         print(f" File not found: {csv_file_path}")
-        return
-
-    data = []
+        return False
 
+    # Rows are streamed: the encoding is sniffed once and the loaders pull them in batches
     try:
-        with open(csv_file_path, newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            data = list(reader)
-    except UnicodeDecodeError as e:
-        print(f" UTF-8 decoding failed at byte {e.start}: {e.reason}")
-        print(f" Retrying with ISO-8859-1 encoding...")
-        try:
-            with open(csv_file_path, newline='', encoding='iso-8859-1') as f:
-                reader = csv.DictReader(f)
-                data = list(reader)
-        except Exception as e2:
-            print(f" Failed to read CSV with fallback encoding: {e2}")
-            return
+        rows = iter_records(csv_file_path)
+        first = next(rows, None)
     except Exception as e:
-        print(f" Failed to read CSV: {e}")
-        return
+        print(f" Failed to read {csv_file_path}: {e}")
+        return False
 
-    if not data:
+    if first is None:
         print(f" No records found in CSV: {csv_file_path}")
-        return
+        return False
+    data = typed_rows(itertools.chain([first], rows), FIELD_TYPES.get(parser_key, {}))
 
     # Route based on parser key
-    if parser_key in {"un", "uk", "ofac", "swiss", "sdn", "aus", "eur"}:
-        print(f" Inserting data for parser: {parser_key}")
-        insert_common_data(data)
+    if parser_key in COMMON_PARSER_KEYS:
+        print(f" Inserting data for parser: {parser_key} ({LOAD_MODE})")
+        if LOAD_MODE == "row":
+            insert_common_data(data)
+        elif LOAD_MODE == "staging":
+            insert_common_data_staged(data)
+        elif LOAD_MODE == "reload":
+            reload_common_data(data)
+        else:
+            insert_common_data_bulk(data, preload=(LOAD_MODE == "preload"))
     elif parser_key == 'can':
-        insert_cannada_data(data)
+        if LOAD_MODE == "row":
+            insert_cannada_data(data)
+        else:
+            insert_cannada_data_bulk(data)
     elif parser_key == 'interpol':
-        insert_interpol_data(data)
+        if LOAD_MODE == "row":
+            insert_interpol_data(data)
+        else:
+            insert_interpol_data_bulk(data)
     else:
         print(f" No insert logic for parser: {parser_key}")
+        return False
+    return True
+
+
+def reload_parsed_data(csv_file_paths, removed=None, carried=()):
+    """
+    LOAD_MODE=reload for several common-schema sources at once. Their cleaned artifacts
+    are streamed into one reload_common_data call, so the shadow tables are built once
+    instead of once per source, each copying every other source. `removed` and `carried`
+    are a delta's keys, passed through to reload_common_data.
+
+    Returns False if a file is missing or there is nothing to load.
+    """
+    missing = [path for path in csv_file_paths if not os.path.exists(path)]
+    if missing:
+        print(f" File not found: {', '.join(missing)}")
+        return False
+
+    rows = itertools.chain.from_iterable(iter_records(path) for path in csv_file_paths)
+    first = next(rows, None)
+    if first is None:
+        print(f" No records found in: {', '.join(csv_file_paths)}")
+        return False
+
+    print(f" Reloading {len(csv_file_paths)} common-schema sources")
+    reload_common_data(itertools.chain([first], rows), removed=removed, carried=carried)
+    return True
@@ -0,0 +1,274 @@
+"""
+Full reload of common-schema sources through shadow tables (LOAD_MODE=reload).
+
+The live tables are never written row by row. Instead:
+
+1. sanctioned_entities and its child tables are cloned (CREATE TABLE ... LIKE) into
+   *_shadow tables, whose non-unique lookup indexes are dropped. Unique keys stay: they
+   dedup under the table collation, which Python case folding only approximates.
+2. The rows of every other source are copied over with INSERT ... SELECT.
+3. The reloaded source is deduplicated in Python and bulk inserted, with entity ids
+   assigned here: existing (name, source) pairs keep their id, new ones continue after
+   the current maximum, so nothing has to be read back. Reloaded rows have no
+   delisted_at, so records that came back are listed again.
+4. Records of the reloaded source missing from the new data are copied over with their
+   child rows (never deleted) and stamped delisted_at. When the reload applies a delta,
+   only the keys it removed are stamped, so its DELTA_MAX_REMOVED_FRACTION guard holds.
+5. The lookup indexes are rebuilt in one ALTER per table and all tables are swapped in with a
+   single atomic RENAME TABLE; the old tables are dropped.
+
+Readers keep using the live tables until the rename, which only waits for running
+statements. The tables are not partitioned, so partition exchange does not apply.
+The reload holds the common tables' write lock exclusively (common_loader.common_write_lock),
+which every other loader of these tables takes too, so no write is lost at the swap.
+Since every reload copies the sources it does not replace, a run reloads all its common
+sources in one call (load_to_db.reload_parsed_data) rather than one per source.
+
+Pending: the shadow copy, keep_delisted and the RENAME swap have not been run against
+MySQL yet. Run them on the local-db compose service before relying on this mode:
+
+    docker compose --profile local-db up -d mysql
+    python -m benchmarks.bench_loaders --modes reload --rows 20000
+"""
+from utils.db_connection import pooled_connection
+from loaders.common_loader import (
+    BULK_BATCH_SIZE, CHILD_TABLES, common_write_lock, fold, iter_batches, placeholders, safe_parse_list,
+)
+
+ENTITY_TABLE = "sanctioned_entities"
+TABLES = [ENTITY_TABLE] + [table for table, _, _ in CHILD_TABLES]
+
+
+def shadow(table):
+    return f"{table}_shadow"
+
+
+def retired(table):
+    return f"{table}_old"
+
+
+def secondary_indexes(cursor, table):
+    """Returns [(index, unique, [columns])] for every index of `table` except the primary key."""
+    cursor.execute(
+        "SELECT INDEX_NAME, NON_UNIQUE, COLUMN_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME <> 'PRIMARY' "
+        "ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+        (table,)
+    )
+    indexes = {}
+    for index, non_unique, column in cursor.fetchall():
+        indexes.setdefault(index, (not non_unique, []))[1].append(column)
+    return [(index, unique, columns) for index, (unique, columns) in indexes.items()]
+
+
+def create_shadow(cursor, table):
+    """Creates an empty clone of `table` without its lookup indexes; returns the indexes to rebuild afterwards."""
+    indexes = [index for index in secondary_indexes(cursor, table) if not index[1]]
+    cursor.execute(f"DROP TABLE IF EXISTS {shadow(table)}")
+    cursor.execute(f"CREATE TABLE {shadow(table)} LIKE {table}")
+    if indexes:
+        drops = ", ".join(f"DROP INDEX {index}" for index, _, _ in indexes)
+        cursor.execute(f"ALTER TABLE {shadow(table)} {drops}")
+    return indexes
+
+
+def rebuild_indexes(cursor, table, indexes):
+    if indexes:
+        adds = ", ".join(f"ADD KEY {index} ({', '.join(columns)})" for index, _, columns in indexes)
+        cursor.execute(f"ALTER TABLE {shadow(table)} {adds}")
+
+
+def copy_other_sources(cursor, sources):
+    keep = " AND ".join(["NOT (e.source <=> %s)"] * len(sources))
+    cursor.execute(
+        f"INSERT INTO {shadow(ENTITY_TABLE)} SELECT e.* FROM {ENTITY_TABLE} e WHERE {keep}",
+        sources
+    )
+    for table, _, _ in CHILD_TABLES:
+        cursor.execute(
+            f"INSERT INTO {shadow(table)} SELECT c.* FROM {table} c "
+            f"JOIN {ENTITY_TABLE} e ON e.entity_id = c.entity_id WHERE {keep}",
+            sources
+        )
+
+
+def existing_entity_ids(cursor, sources):
+    """(fold(name), fold(source)) -> entity_id of the reloaded sources, so their ids survive the reload."""
+    cursor.execute(
+        f"SELECT name, source, entity_id FROM {ENTITY_TABLE} "
+        f"WHERE source IN ({placeholders(len(sources))}) ORDER BY entity_id",
+        sources
+    )
+    ids = {}
+    for name, source, entity_id in cursor.fetchall():
+        ids.setdefault((fold(name), fold(source)), entity_id)
+    return ids
+
+
+def build_rows(data, known_ids, next_id):
+    """
+    Deduplicates the reloaded rows like the other loaders (first designation wins,
+    child values once per entity) and returns (entity rows, {table: child rows}).
+    """
+    entities = []
+    children = {table: [] for table, _, _ in CHILD_TABLES}
+    ids = {}
+    seen_values = set()
+
+    for row in data:
+        name, source = row.get("Name"), row.get("Source")
+        key = (fold(name), fold(source))
+        if name is not None and key in ids:
+            entity_id = ids[key]
+        else:
+            entity_id = known_ids.get(key) if name is not None else None
+            if entity_id is None:
+                entity_id = next_id
+                next_id += 1
+            if name is not None:
+                ids[key] = entity_id
+            entities.append((entity_id, name, row.get("Designation"), source))
+
+        for table, _, field in CHILD_TABLES:
+            for value in safe_parse_list(row.get(field)):
+                value_key = (table, entity_id, fold(value))
+                if value_key not in seen_values:
+                    seen_values.add(value_key)
+                    children[table].append((entity_id, value))
+
+    return entities, children
+
+
+def insert_entities(cursor, entities, batch_size):
+    """
+    Inserts the entity rows; returns {dropped id: surviving id} for rows the unique key
+    rejected because the collation treats them as equal to an earlier one (e.g. accents).
+    """
+    merged = {}
+    for batch in iter_batches(entities, batch_size):
+        inserted = cursor.executemany(
+            f"INSERT IGNORE INTO {shadow(ENTITY_TABLE)} (entity_id, name, designation, source) "
+            "VALUES (%s, %s, %s, %s)",
+            batch
+        )
+        if inserted == len(batch):
+            continue
+        ids = [entity_id for entity_id, _, _, _ in batch]
+        cursor.execute(
+            f"SELECT entity_id FROM {shadow(ENTITY_TABLE)} WHERE entity_id IN ({placeholders(len(ids))})",
+            ids
+        )
+        stored = {entity_id for (entity_id,) in cursor.fetchall()}
+        for entity_id, name, _, source in batch:
+            if entity_id not in stored:
+                cursor.execute(
+                    f"SELECT entity_id FROM {shadow(ENTITY_TABLE)} WHERE name = %s AND source = %s",
+                    (name, source)
+                )
+                merged[entity_id] = cursor.fetchone()[0]
+    return merged
+
+
+def keep_delisted(cursor, sources, removed=None, carried=()):
+    """
+    Copies the entities of `sources` that the reload did not write, with their child rows;
+    returns (entities kept, entities stamped delisted).
+
+    Without `removed` every kept entity is stamped delisted. With `removed` (a delta's
+    [name, source] keys), only those are stamped; the others keep their delisted_at, and the
+    `carried` keys, which a truncated feed left out (DELTA_MAX_REMOVED_FRACTION), stay listed.
+    """
+    in_sources = f"source IN ({placeholders(len(sources))})"
+    # Entities neither written by the reload nor equal to a written one under the collation
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS reload_kept")
+    cursor.execute("CREATE TEMPORARY TABLE reload_kept (entity_id INT NOT NULL PRIMARY KEY)")
+    kept = cursor.execute(
+        f"INSERT INTO reload_kept SELECT e.entity_id FROM {ENTITY_TABLE} e WHERE e.{in_sources} "
+        f"AND NOT EXISTS (SELECT 1 FROM {shadow(ENTITY_TABLE)} s WHERE s.entity_id = e.entity_id) "
+        f"AND NOT EXISTS (SELECT 1 FROM {shadow(ENTITY_TABLE)} s WHERE s.name = e.name AND s.source = e.source)",
+        sources
+    )
+    cursor.execute(
+        f"INSERT INTO {shadow(ENTITY_TABLE)} SELECT e.* FROM {ENTITY_TABLE} e "
+        "JOIN reload_kept k ON k.entity_id = e.entity_id"
+    )
+    for table, column, _ in CHILD_TABLES:
+        # Child ids are left to AUTO_INCREMENT, so they cannot collide with the reloaded rows
+        cursor.execute(
+            f"INSERT INTO {shadow(table)} (entity_id, {column}) "
+            f"SELECT c.entity_id, c.{column} FROM {table} c JOIN reload_kept k ON k.entity_id = c.entity_id"
+        )
+
+    set_delisted = (
+        f"UPDATE {shadow(ENTITY_TABLE)} s JOIN reload_kept k ON k.entity_id = s.entity_id "
+        "SET s.delisted_at = {value}"
+    )
+    delist = set_delisted.format(value="COALESCE(s.delisted_at, NOW())")
+    by_key = " WHERE s.name = %s AND s.source = %s"
+    if removed is None:
+        delisted = cursor.execute(delist)
+    else:
+        delisted = cursor.executemany(delist + by_key, removed) if removed else 0
+        if carried:
+            cursor.executemany(set_delisted.format(value="NULL") + by_key, carried)
+    cursor.execute("DROP TEMPORARY TABLE reload_kept")
+    return kept, delisted
+
+
+def swap_in_shadows(cursor):
+    # Left over by a reload that stopped between the RENAME and the DROP; the RENAME would fail on them
+    cursor.execute(f"DROP TABLE IF EXISTS {', '.join(retired(table) for table in TABLES)}")
+    renames = ", ".join(
+        f"{table} TO {retired(table)}, {shadow(table)} TO {table}" for table in TABLES
+    )
+    cursor.execute(f"RENAME TABLE {renames}")
+    cursor.execute(f"DROP TABLE {', '.join(retired(table) for table in TABLES)}")
+
+
+def reload_common_data(data, batch_size=BULK_BATCH_SIZE, removed=None, carried=()):
+    """
+    Replaces everything stored for the sources in `data` with exactly `data`. Their records
+    missing from `data` are kept; keep_delisted stamps them delisted, or with a delta's
+    `removed` and `carried` keys, only the removed ones.
+    """
+    # The set of sources is needed up front, so unlike the other loaders this one holds every row
+    data = list(data)
+    if not data:
+        print("⚠️ No data to insert.")
+        return
+
+    sources = list({fold(row.get("Source")): row.get("Source") for row in data}.values())
+
+    try:
+        # Exclusive: no other loader writes to the live tables until the swap is done
+        with pooled_connection() as conn, conn.cursor() as cursor, common_write_lock(cursor, exclusive=True):
+            known_ids = existing_entity_ids(cursor, sources)
+            cursor.execute(f"SELECT COALESCE(MAX(entity_id), 0) + 1 FROM {ENTITY_TABLE}")
+            next_id = cursor.fetchone()[0]
+
+            indexes = {table: create_shadow(cursor, table) for table in TABLES}
+            copy_other_sources(cursor, sources)
+
+            entities, children = build_rows(data, known_ids, next_id)
+            merged = insert_entities(cursor, entities, batch_size)
+            for table, column, _ in CHILD_TABLES:
+                rows = [(merged.get(entity_id, entity_id), value) for entity_id, value in children[table]]
+                for batch in iter_batches(rows, batch_size):
+                    cursor.executemany(
+                        f"INSERT IGNORE INTO {shadow(table)} (entity_id, {column}) VALUES (%s, %s)",
+                        batch
+                    )
+            kept, delisted = keep_delisted(cursor, sources, removed, carried)
+
+            for table in TABLES:
+                rebuild_indexes(cursor, table, indexes[table])
+            conn.commit()
+
+            swap_in_shadows(cursor)
+
+        print(f"✅ Reloaded {len(data)} rows ({len(entities) - len(merged)} entities, {kept} kept, {delisted} delisted) "
+              f"for {', '.join(map(str, sources))}.")
+
+    except Exception as e:
+        print(f"❌ Failed to reload common data: {e}")
+        raise
@@ -0,0 +1,253 @@
+"""
+Versioned schema for sanction_db.
+
+MIGRATIONS is an ordered list of (version, description, function). migrate() applies every
+version above the one recorded in `schema_version`, under a named lock so concurrent loads
+cannot run the same migration twice. Run it by hand with `python -m loaders.schema`.
+
+The unique keys are what the loaders rely on for dedup (INSERT IGNORE /
+ON DUPLICATE KEY UPDATE), so they must exist before any data is loaded.
+"""
+from utils.db_connection import pooled_connection
+
+SCHEMA_LOCK = "sanction_db_schema"
+SCHEMA_LOCK_TIMEOUT = 60
+
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS sanctioned_entities (
+        entity_id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255),
+        designation TEXT,
+        source VARCHAR(100),
+        UNIQUE KEY uq_entity_name_source (name, source),
+        KEY idx_entity_source (source)
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS aliases (
+        alias_id INT AUTO_INCREMENT PRIMARY KEY,
+        entity_id INT NOT NULL,
+        alias_name VARCHAR(255) NOT NULL,
+        UNIQUE KEY uq_alias (entity_id, alias_name),
+        KEY idx_alias_name (alias_name)
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS nationalities (
+        nat_id INT AUTO_INCREMENT PRIMARY KEY,
+        entity_id INT NOT NULL,
+        nationality VARCHAR(255) NOT NULL,
+        UNIQUE KEY uq_nationality (entity_id, nationality),
+        KEY idx_nationality (nationality)
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sanction_types (
+        type_id INT AUTO_INCREMENT PRIMARY KEY,
+        entity_id INT NOT NULL,
+        sanction_type VARCHAR(255) NOT NULL,
+        UNIQUE KEY uq_sanction_type (entity_id, sanction_type)
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cannada_tbl (
+        entity_id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        nationalities VARCHAR(255) NOT NULL,
+        date_of_listing DATE NULL,
+        source VARCHAR(100),
+        UNIQUE KEY uq_cannada (name, nationalities, date_of_listing)
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS interpol_tbl (
+        entity_id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        age INT NOT NULL,
+        UNIQUE KEY uq_interpol (name, age)
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS interpol_nationality (
+        nat_id INT AUTO_INCREMENT PRIMARY KEY,
+        entity_id INT NOT NULL,
+        nationality VARCHAR(255) NOT NULL,
+        UNIQUE KEY uq_interpol_nationality (entity_id, nationality),
+        KEY idx_interpol_nationality (nationality)
+    ) DEFAULT CHARSET=utf8mb4
+    """,
+]
+
+# Primary key of every managed table
+ID_COLUMNS = {
+    "sanctioned_entities": "entity_id",
+    "aliases": "alias_id",
+    "nationalities": "nat_id",
+    "sanction_types": "type_id",
+    "cannada_tbl": "entity_id",
+    "interpol_tbl": "entity_id",
+    "interpol_nationality": "nat_id",
+}
+
+# Tables whose rows point at another table's entity_id
+DEPENDENT_TABLES = {
+    "sanctioned_entities": ["aliases", "nationalities", "sanction_types"],
+    "interpol_tbl": ["interpol_nationality"],
+}
+
+# (table, index, unique, columns) - same keys as in TABLES, in dependency order (parents first)
+INDEXES = [
+    ("sanctioned_entities", "uq_entity_name_source", True, ["name", "source"]),
+    ("sanctioned_entities", "idx_entity_source", False, ["source"]),
+    ("aliases", "uq_alias", True, ["entity_id", "alias_name"]),
+    ("aliases", "idx_alias_name", False, ["alias_name"]),
+    ("nationalities", "uq_nationality", True, ["entity_id", "nationality"]),
+    ("nationalities", "idx_nationality", False, ["nationality"]),
+    ("sanction_types", "uq_sanction_type", True, ["entity_id", "sanction_type"]),
+    ("cannada_tbl", "uq_cannada", True, ["name", "nationalities", "date_of_listing"]),
+    ("interpol_tbl", "uq_interpol", True, ["name", "age"]),
+    ("interpol_nationality", "uq_interpol_nationality", True, ["entity_id", "nationality"]),
+    ("interpol_nationality", "idx_interpol_nationality", False, ["nationality"]),
+]
+
+
+def create_tables(cursor):
+    for ddl in TABLES:
+        cursor.execute(ddl)
+
+
+def index_exists(cursor, table, index):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s LIMIT 1",
+        (table, index)
+    )
+    return cursor.fetchone() is not None
+
+
+def merge_duplicates(cursor, table, columns):
+    """
+    Keeps the lowest id of every group of rows sharing `columns`, repoints child rows
+    at it and deletes the rest, so a unique key can be added to a table filled by the
+    old SELECT-then-INSERT loaders.
+    """
+    id_column = ID_COLUMNS[table]
+    same_key = " AND ".join(f"k.{column} = t.{column}" for column in columns)
+
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS duplicate_ids")
+    cursor.execute(
+        f"CREATE TEMPORARY TABLE duplicate_ids AS "
+        f"SELECT t.{id_column} AS duplicate_id, MIN(k.{id_column}) AS keep_id "
+        f"FROM {table} t JOIN {table} k ON {same_key} AND k.{id_column} < t.{id_column} "
+        f"GROUP BY t.{id_column}"
+    )
+    for child in DEPENDENT_TABLES.get(table, []):
+        cursor.execute(
+            f"UPDATE {child} c JOIN duplicate_ids d ON c.entity_id = d.duplicate_id "
+            "SET c.entity_id = d.keep_id"
+        )
+    removed = cursor.execute(
+        f"DELETE t FROM {table} t JOIN duplicate_ids d ON t.{id_column} = d.duplicate_id"
+    )
+    cursor.execute("DROP TEMPORARY TABLE duplicate_ids")
+    if removed:
+        print(f"🧹 Merged {removed} duplicate rows in {table}")
+
+
+def add_missing_indexes(cursor):
+    """Tables created before this module existed get their keys added in place."""
+    for table, index, unique, columns in INDEXES:
+        if index_exists(cursor, table, index):
+            continue
+        if unique:
+            merge_duplicates(cursor, table, columns)
+        kind = "UNIQUE KEY" if unique else "KEY"
+        cursor.execute(f"ALTER TABLE {table} ADD {kind} {index} ({', '.join(columns)})")
+        print(f"🛠️ Added {kind.lower()} {index} on {table}")
+
+
+def column_exists(cursor, table, column):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s LIMIT 1",
+        (table, column)
+    )
+    return cursor.fetchone() is not None
+
+
+def add_delisted_at(cursor):
+    """Records dropped from a source are kept and stamped instead of deleted (etl/delta.py)."""
+    for table in ("sanctioned_entities", "cannada_tbl", "interpol_tbl"):
+        if not column_exists(cursor, table, "delisted_at"):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN delisted_at DATETIME NULL")
+
+
+ENTITY_CLUSTERS = """
+    CREATE TABLE IF NOT EXISTS entity_clusters (
+        entity_id INT PRIMARY KEY,
+        cluster_id INT NOT NULL,
+        score FLOAT NOT NULL,
+        resolved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        KEY idx_cluster (cluster_id)
+    ) DEFAULT CHARSET=utf8mb4
+"""
+
+
+def create_entity_clusters(cursor):
+    """Cross-source matches of sanctioned_entities, rewritten by etl/resolve.py after every load."""
+    cursor.execute(ENTITY_CLUSTERS)
+
+
+MIGRATIONS = [
+    (1, "create tables", create_tables),
+    (2, "add keys to pre-existing tables", add_missing_indexes),
+    (3, "add delisted_at", add_delisted_at),
+    (4, "add entity_clusters", create_entity_clusters),
+]
+
+
+def current_version(cursor):
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INT PRIMARY KEY, "
+        "description VARCHAR(255), "
+        "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+
+def migrate():
+    """Brings sanction_db up to the latest schema version and returns that version."""
+    try:
+        with pooled_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT GET_LOCK(%s, %s)", (SCHEMA_LOCK, SCHEMA_LOCK_TIMEOUT))
+            if cursor.fetchone()[0] != 1:
+                raise RuntimeError("Timed out waiting for the schema migration lock")
+
+            try:
+                version = current_version(cursor)
+                for number, description, apply in MIGRATIONS:
+                    if number <= version:
+                        continue
+                    print(f"🛠️ Applying schema migration {number}: {description}")
+                    apply(cursor)
+                    cursor.execute(
+                        "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                        (number, description)
+                    )
+                    conn.commit()
+                    version = number
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (SCHEMA_LOCK,))
+
+        print(f"✅ Schema at version {version}")
+        return version
+
+    except Exception as e:
+        print(f"❌ Schema migration failed: {e}")
+        raise
+
+if __name__ == "__main__":
+    migrate()
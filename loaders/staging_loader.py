@@ -0,0 +1,152 @@
+"""
+Staging-table loader for the common schema (LOAD_MODE=staging).
+
+Each cleaned file is written once to tab-separated temp files, streamed into TEMPORARY
+staging tables with LOAD DATA LOCAL INFILE, and merged into sanctioned_entities and its
+child tables with set-based INSERT IGNORE ... SELECT statements. Deduplication is done by
+the tables' unique keys (see loaders/schema.py): rows are merged in file order, so the
+first row of each (name, source) / (entity, value) wins, exactly like insert_common_data.
+
+Needs local_infile enabled on the server. Like every writer of the common tables, it holds
+a slot of common_write_lock until it commits.
+
+Pending: its throughput against the row loader (target: 10x the rows/sec) has not been
+measured yet. Measure it on the local-db compose service before making it a default:
+
+    docker compose --profile local-db up -d mysql
+    python -m benchmarks.bench_loaders --modes row staging --rows 20000
+"""
+import os
+import tempfile
+
+from utils.db_connection import pooled_connection
+from loaders.common_loader import CHILD_TABLES, common_write_lock, insert_entity_batch, safe_parse_list
+
+TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"})
+
+LOAD_TSV = (
+    "LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+    "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({columns})"
+)
+
+MERGE_ENTITIES = """
+    INSERT IGNORE INTO sanctioned_entities (name, designation, source)
+    SELECT name, designation, source FROM stage_entities
+    ORDER BY seq
+"""
+
+RESOLVE_ENTITY_IDS = """
+    UPDATE stage_entities s
+    JOIN sanctioned_entities e ON e.name = s.name AND e.source = s.source
+    SET s.entity_id = e.entity_id
+"""
+
+MERGE_CHILDREN = """
+    INSERT IGNORE INTO {table} (entity_id, {column})
+    SELECT s.entity_id, c.value
+    FROM stage_{table} c JOIN stage_entities s ON s.seq = c.entity_seq
+    ORDER BY c.seq
+"""
+
+
+def tsv_line(values):
+    """One LOAD DATA line with MySQL's default escaping; None becomes \\N (NULL)."""
+    return "\t".join("\\N" if v is None else str(v).translate(TSV_ESCAPES) for v in values) + "\n"
+
+
+def write_stage_files(data, directory):
+    """
+    Writes the entity rows and one file per child table. Child lines point at their
+    entity line by seq. Rows without a name are returned instead: NULL never matches
+    in SQL, so each of them is inserted as its own entity like the row loader does.
+    """
+    paths = {"entities": os.path.join(directory, "entities.tsv")}
+    paths.update({table: os.path.join(directory, f"{table}.tsv") for table, _, _ in CHILD_TABLES})
+    files = {key: open(path, "w", encoding="utf-8", newline="") for key, path in paths.items()}
+
+    unnamed = []
+    row_count = 0
+    try:
+        for seq, row in enumerate(data, start=1):
+            row_count += 1
+            if row.get("Name") is None:
+                unnamed.append(row)
+                continue
+            files["entities"].write(tsv_line((seq, row.get("Name"), row.get("Designation"), row.get("Source"))))
+            for table, _, field in CHILD_TABLES:
+                for value in safe_parse_list(row.get(field)):
+                    files[table].write(tsv_line((seq, value)))
+    finally:
+        for f in files.values():
+            f.close()
+
+    return paths, unnamed, row_count
+
+
+def create_stage_tables(cursor):
+    # Value columns are copied from the live tables so types and collations match exactly
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS stage_entities")
+    cursor.execute(
+        "CREATE TEMPORARY TABLE stage_entities AS "
+        "SELECT name, designation, source FROM sanctioned_entities LIMIT 0"
+    )
+    cursor.execute(
+        "ALTER TABLE stage_entities ADD COLUMN seq INT NOT NULL PRIMARY KEY FIRST, "
+        "ADD COLUMN entity_id INT NULL"
+    )
+
+    for table, column, _ in CHILD_TABLES:
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS stage_{table}")
+        cursor.execute(f"CREATE TEMPORARY TABLE stage_{table} AS SELECT {column} AS value FROM {table} LIMIT 0")
+        cursor.execute(
+            f"ALTER TABLE stage_{table} ADD COLUMN seq INT NOT NULL AUTO_INCREMENT PRIMARY KEY FIRST, "
+            "ADD COLUMN entity_seq INT NOT NULL AFTER seq, ADD KEY (entity_seq)"
+        )
+
+
+def merge_stage_tables(cursor):
+    """Runs the set-based merge; returns the number of new entities."""
+    cursor.execute(MERGE_ENTITIES)
+    new_entities = cursor.rowcount
+    cursor.execute(RESOLVE_ENTITY_IDS)
+    for table, column, _ in CHILD_TABLES:
+        cursor.execute(MERGE_CHILDREN.format(table=table, column=column))
+    return new_entities
+
+
+def insert_common_data_staged(data):
+    """
+    Loads common-schema rows through LOAD DATA LOCAL INFILE into staging tables
+    and merges them in SQL. Same resulting rows as insert_common_data.
+    """
+    if not data:
+        print("⚠️ No data to insert.")
+        return
+
+    try:
+        with pooled_connection(local_infile=True) as conn:
+            with tempfile.TemporaryDirectory(prefix="stage_") as directory:
+                paths, unnamed, row_count = write_stage_files(data, directory)
+
+                with conn.cursor() as cursor, common_write_lock(cursor):
+                    create_stage_tables(cursor)
+                    cursor.execute(
+                        LOAD_TSV.format(table="stage_entities", columns="seq, name, designation, source"),
+                        (paths["entities"],)
+                    )
+                    for table, _, _ in CHILD_TABLES:
+                        cursor.execute(
+                            LOAD_TSV.format(table=f"stage_{table}", columns="entity_seq, value"),
+                            (paths[table],)
+                        )
+
+                    new_entities = merge_stage_tables(cursor)
+                    if unnamed:
+                        new_entities += insert_entity_batch(cursor, unnamed)
+                    conn.commit()
+
+            print(f"✅ Staged load of {row_count} rows ({new_entities} new entities).")
+
+    except Exception as e:
+        print(f"❌ Failed to stage common data: {e}")
+        raise
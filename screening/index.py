@@ -0,0 +1,289 @@
+"""
+In-memory character-trigram index for fuzzy screening of names against the sanctions lists.
+
+Every entity name and alias becomes an entry, and each trigram (padded, so word starts
+weigh more) has a posting list of the entries containing it. A query is scored against
+the entries by Jaccard similarity of trigram sets, |q & e| / |q | e|:
+
+- the postings of the query's trigrams are concatenated and counted with one bincount,
+  which gives |q & e| for every entry at once (unknown trigrams cost nothing)
+- count filter: an entry with Jaccard >= t shares at least ceil(t*|q|) trigrams with
+  the query, so only entries reaching that count are scored at all
+
+Postings are stored CSR-style in NumPy arrays, so a lookup is a handful of vectorized
+operations whatever the name; common trigrams (e.g. "moh") only make the bincount longer.
+The best entry per entity is returned, top-k. The index is built from the cleaned
+artifacts (build_from_cleaned) or from the listed rows in the database (build_from_db),
+which skips delisted records, or mapped from the snapshot the ETL writes
+(screening/snapshot.py).
+
+Names are compared after screening/normalize.normalize (transliteration, case and
+diacritic folding). Entries whose whole name sounds the same as the query (phonetic
+keys, screening/phonetic.py) are returned below the threshold, flagged "phonetic", as
+long as they still score SCREEN_PHONETIC_MIN_SCORE: a phonetic key alone also matches
+unrelated names with no trigram in common (Zafar / Sever).
+"""
+import argparse
+import glob
+import math
+import os
+import time
+
+import numpy as np
+
+from utils.artifacts import iter_records, safe_parse_list
+from screening.normalize import normalize
+from screening.phonetic import PhoneticIndex
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLEANED_DIR = os.path.join(BASE_DIR, "cleaned")
+
+# Default minimum similarity and number of results per query
+SCREEN_THRESHOLD = float(os.getenv("SCREEN_THRESHOLD", "0.5"))
+SCREEN_TOP_K = int(os.getenv("SCREEN_TOP_K", "10"))
+# Minimum similarity of matches below the threshold that sound like the query
+SCREEN_PHONETIC_MIN_SCORE = float(os.getenv("SCREEN_PHONETIC_MIN_SCORE", "0.1"))
+
+def trigrams(text):
+    padded = f"  {normalize(text)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Trigram inverted index over (name, source, aliases) records.
+
+    entities[i]    - (name, source) of entity i
+    entry_text[j]  - the name or alias entry j was built from
+    entry_entity   - entity index of every entry
+    entry_sizes    - number of distinct trigrams of every entry
+    gram_ids       - trigram -> id; the entries of trigram g are
+                     posting_entries[posting_offsets[g]:posting_offsets[g + 1]], ascending
+    phonetic       - PhoneticIndex over the same entries
+    """
+
+    def __init__(self):
+        self.gram_ids = {}
+        self.entities = []
+        self.entry_text = []
+        self._entry_entity = []
+        self._entry_sizes = []
+        self._postings = []
+        self.phonetic = PhoneticIndex()
+        self._seen = set()
+        self._frozen = False
+
+    def __len__(self):
+        return len(self.entry_text)
+
+    def add(self, name, source, aliases=()):
+        """Adds an entity with its aliases; repeated (name, source) pairs are ignored."""
+        if not name or (normalize(name), source) in self._seen:
+            return
+        self._seen.add((normalize(name), source))
+        entity = len(self.entities)
+        self.entities.append((name, source))
+
+        texts = {}
+        for text in [name, *aliases]:
+            texts.setdefault(normalize(text), text)
+        for key, text in texts.items():
+            if key:
+                self._add_entry(entity, text)
+
+    def _add_entry(self, entity, text):
+        entry = len(self.entry_text)
+        grams = trigrams(text)
+        for gram in grams:
+            gram_id = self.gram_ids.get(gram)
+            if gram_id is None:
+                gram_id = self.gram_ids[gram] = len(self._postings)
+                self._postings.append([])
+            self._postings[gram_id].append(entry)
+        self.entry_text.append(text)
+        self._entry_entity.append(entity)
+        self._entry_sizes.append(len(grams))
+        self.phonetic.add(entry, text)
+        self._frozen = False
+
+    def freeze(self):
+        """Packs the postings into the flat arrays search() reads; called automatically."""
+        lengths = np.fromiter((len(p) for p in self._postings), dtype=np.int64, count=len(self._postings))
+        self.posting_offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.posting_offsets[1:])
+        self.posting_entries = np.fromiter(
+            (entry for posting in self._postings for entry in posting),
+            dtype=np.int32, count=int(self.posting_offsets[-1])
+        )
+        self.entry_entity = np.asarray(self._entry_entity, dtype=np.int32)
+        self.entry_sizes = np.asarray(self._entry_sizes, dtype=np.int32)
+        self._frozen = True
+
+    def _candidates(self, query, threshold):
+        """Entries worth scoring for `query` with their trigram overlap: (entries, overlap, phonetic, |q|)."""
+        grams = trigrams(query)
+        size = len(grams)
+        required = max(1, math.ceil(threshold * size))
+
+        phonetic = np.fromiter(self.phonetic.lookup(query), dtype=np.int64)
+        known = [self.gram_ids[gram] for gram in grams if gram in self.gram_ids]
+        if len(known) < required and not len(phonetic):
+            return None
+        offsets, entries = self.posting_offsets, self.posting_entries
+        postings = [entries[offsets[gram_id]:offsets[gram_id + 1]] for gram_id in known]
+        counts = np.bincount(
+            np.concatenate(postings) if postings else np.zeros(0, dtype=np.int32),
+            minlength=len(self.entry_text)
+        )
+
+        selected = counts >= required
+        selected[phonetic] = True
+        candidates = np.flatnonzero(selected)
+        sounds_alike = np.isin(candidates, phonetic) if len(phonetic) else np.zeros(len(candidates), dtype=bool)
+        return candidates, counts[candidates], sounds_alike, size
+
+    def search(self, query, k=SCREEN_TOP_K, threshold=SCREEN_THRESHOLD):
+        """
+        Returns up to `k` matches with a score >= `threshold`, or >= SCREEN_PHONETIC_MIN_SCORE
+        for entries that sound like the query, best first, one per entity:
+        [{"name", "source", "matched", "score", "phonetic"}], where `matched` is the name or
+        alias hit and `phonetic` tells whether it sounds like the query.
+        """
+        return self.search_batch([query], k, threshold)[0]
+
+    def search_batch(self, queries, k=SCREEN_TOP_K, threshold=SCREEN_THRESHOLD):
+        """
+        search() for many queries at once; returns one match list per query. Candidates are
+        found per query, then all (query, entry) pairs are scored and ranked together.
+        """
+        if not self._frozen:
+            self.freeze()
+        results = [[] for _ in queries]
+        found = []
+        for position, query in enumerate(queries):
+            if query and normalize(query) and self.entry_text:
+                candidates = self._candidates(query, threshold)
+                if candidates is not None and len(candidates[0]):
+                    found.append((position, *candidates))
+        if not found:
+            return results
+
+        counts = [len(candidates) for _, candidates, _, _, _ in found]
+        positions = np.repeat([position for position, *_ in found], counts)
+        query_sizes = np.repeat([size for *_, size in found], counts)
+        candidates = np.concatenate([candidates for _, candidates, _, _, _ in found])
+        overlap = np.concatenate([overlap for _, _, overlap, _, _ in found])
+        sounds_alike = np.concatenate([sounds_alike for _, _, _, sounds_alike, _ in found])
+
+        scores = overlap / (query_sizes + self.entry_sizes[candidates] - overlap)
+        keep = (scores >= threshold) | (sounds_alike & (scores >= SCREEN_PHONETIC_MIN_SCORE))
+        positions, candidates, scores, sounds_alike = positions[keep], candidates[keep], scores[keep], sounds_alike[keep]
+        if not len(candidates):
+            return results
+
+        # Per query: best entry per entity, then the k best entities (ties: earlier entity first)
+        entities = self.entry_entity[candidates].astype(np.int64)
+        order = np.lexsort((entities, -scores, positions))
+        _, first = np.unique(positions[order] * len(self.entities) + entities[order], return_index=True)
+        best = order[np.sort(first)]
+        ranks = np.arange(len(best)) - np.searchsorted(positions[best], positions[best])
+        for i in best[ranks < k]:
+            results[positions[i]].append({
+                "name": self.entities[entities[i]][0],
+                "source": self.entities[entities[i]][1],
+                "matched": self.entry_text[candidates[i]],
+                "score": round(float(scores[i]), 4),
+                "phonetic": bool(sounds_alike[i]),
+            })
+        return results
+
+
+def cleaned_records(paths=None):
+    """Yields (name, source, aliases) from the cleaned artifacts of every source."""
+    if paths is None:
+        paths = sorted(
+            path for path in glob.glob(os.path.join(CLEANED_DIR, "*_cleaned.*"))
+            if path.endswith((".csv", ".parquet"))
+        )
+    for path in paths:
+        parser_key = os.path.basename(path).split("_", 1)[0]
+        for row in iter_records(path):
+            if parser_key == "can":
+                yield row.get("name"), row.get("source") or "Canada", []
+            elif parser_key == "interpol":
+                yield row.get("Name"), "Interpol", []
+            else:
+                yield row.get("Name"), row.get("Source"), safe_parse_list(row.get("Alias"))
+
+
+def db_records():
+    """Yields (name, source, aliases) for every listed (not delisted) record in the database."""
+    # Imported here: utils.db_connection needs the DB_* settings, which the snapshot and cleaned/ paths do not
+    from utils.db_connection import pooled_connection
+
+    with pooled_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT e.entity_id, e.name, e.source, a.alias_name FROM sanctioned_entities e "
+                "LEFT JOIN aliases a ON a.entity_id = e.entity_id "
+                "WHERE e.delisted_at IS NULL ORDER BY e.entity_id"
+            )
+            current, aliases = None, []
+            for entity_id, name, source, alias in cursor.fetchall():
+                if current is None or current[0] != entity_id:
+                    if current:
+                        yield (*current[1:], aliases)
+                    current, aliases = (entity_id, name, source), []
+                if alias:
+                    aliases.append(alias)
+            if current:
+                yield (*current[1:], aliases)
+
+            cursor.execute("SELECT name, source FROM cannada_tbl WHERE delisted_at IS NULL")
+            for name, source in cursor.fetchall():
+                yield name, source or "Canada", []
+            cursor.execute("SELECT name FROM interpol_tbl WHERE delisted_at IS NULL")
+            for (name,) in cursor.fetchall():
+                yield name, "Interpol", []
+
+
+def build_index(records):
+    index = NameIndex()
+    for name, source, aliases in records:
+        index.add(name, source, aliases)
+    index.freeze()
+    return index
+
+
+def build_from_cleaned(paths=None):
+    return build_index(cleaned_records(paths))
+
+
+def build_from_db():
+    return build_index(db_records())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen names against the sanctions lists")
+    parser.add_argument("names", nargs="+")
+    parser.add_argument("--db", action="store_true", help="build the index from the database instead of using the snapshot or cleaned/")
+    parser.add_argument("--top", type=int, default=SCREEN_TOP_K)
+    parser.add_argument("--threshold", type=float, default=SCREEN_THRESHOLD)
+    args = parser.parse_args()
+
+    from screening.snapshot import load_index
+
+    start = time.perf_counter()
+    index = load_index(args.db)
+    print(f"🔍 Indexed {len(index.entities)} entities ({len(index)} names and aliases) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    for name in args.names:
+        print(f"\n{name}")
+        for match in index.search(name, args.top, args.threshold):
+            print(f"  {match['score']:.2f}  {match['name']} [{match['source']}]"
+                  + (f" (alias {match['matched']})" if match["matched"] != match["name"] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Name normalization for screening: transliteration, case and diacritic folding, and
+phonetic keys.
+
+- transliterate(): Cyrillic and Greek letters to Latin, Latin letters without a Unicode
+  decomposition (ß, ø, ł, æ, ...) to ASCII, everything else through NFKD with the
+  combining marks removed, so "Łukašėnka", "ЛУКАШЕНКА" and "Lukashenka" compare equal
+- normalize(): transliterated, case-folded words separated by single spaces
+- phonetic_codes(): a Double Metaphone style (primary, alternate) code per word, so
+  spelling variants like Mansur/Mansoor or Mohammed/Muhammad get the same code
+- phonetic_keys(): order-independent keys of a whole name, for the hash index in
+  screening/phonetic.py
+
+Per-word results are memoized in bounded LRU caches, since names repeat a small
+vocabulary of words (Mohammad, Ali, Limited, ...).
+"""
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+# Words cached by the LRU caches below
+NORMALIZE_CACHE_SIZE = int(os.getenv("NORMALIZE_CACHE_SIZE", "100000"))
+# Letters kept per phonetic code (Double Metaphone uses 4; names need a bit more)
+PHONETIC_CODE_LENGTH = 6
+
+_LETTERS = str.maketrans({
+    # Latin letters NFKD leaves alone
+    "ß": "ss", "æ": "ae", "Æ": "AE", "œ": "oe", "Œ": "OE", "ø": "o", "Ø": "O", "đ": "d", "Đ": "D",
+    "ł": "l", "Ł": "L", "þ": "th", "Þ": "TH", "ð": "d", "Ð": "D", "ı": "i", "ħ": "h", "Ħ": "H",
+    # Latin letters whose decomposition would lose the sound (Lukašenka = Lukashenka)
+    "š": "sh", "Š": "SH", "č": "ch", "Č": "CH", "ž": "zh", "Ž": "ZH",
+    # Cyrillic
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh", "з": "z",
+    "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r",
+    "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh",
+    "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya", "і": "i",
+    "ї": "yi", "є": "ye", "ґ": "g", "ў": "u",
+    # Greek
+    "α": "a", "β": "v", "γ": "g", "δ": "d", "ε": "e", "ζ": "z", "η": "i", "θ": "th", "ι": "i",
+    "κ": "k", "λ": "l", "μ": "m", "ν": "n", "ξ": "x", "ο": "o", "π": "p", "ρ": "r", "σ": "s",
+    "ς": "s", "τ": "t", "υ": "y", "φ": "f", "χ": "ch", "ψ": "ps", "ω": "o",
+})
+
+_NON_WORD = re.compile(r"[\W_]+")
+_VOWELS = set("AEIOUY")
+_FRONT_VOWELS = set("EIY")
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _fold_word(word):
+    word = unicodedata.normalize("NFKD", word.casefold().translate(_LETTERS))
+    return "".join(ch for ch in word if not unicodedata.combining(ch))
+
+
+def transliterate(text):
+    """Latin-script, accent-free and case-folded version of `text` (punctuation kept)."""
+    return " ".join(_fold_word(word) for word in text.split())
+
+
+def normalize(text):
+    """Transliterated, case-folded words separated by single spaces; punctuation is dropped."""
+    return " ".join(_NON_WORD.sub(" ", transliterate(text)).split())
+
+
+def _encode(word):
+    """(primary, alternate) phonetic code of one upper-case ASCII word."""
+    primary, alternate = [], []
+
+    def add(main, alt=None):
+        primary.append(main)
+        alternate.append(main if alt is None else alt)
+
+    length = len(word)
+    at = lambda i: word[i] if 0 <= i < length else ""
+    i = 0
+    # Silent first letters
+    if word[:2] in ("GN", "KN", "PN", "WR", "PS"):
+        i = 1
+    if at(i) == "X":
+        add("S")
+        i += 1
+    elif at(i) in _VOWELS:
+        add("A")
+        i += 1
+
+    while i < length:
+        ch, after = word[i], at(i + 1)
+        step = 2 if after == ch and ch != "C" else 1
+
+        if ch in _VOWELS:
+            pass
+        elif ch == "B":
+            add("P")
+        elif ch == "C":
+            if after == "H":
+                add("X", "K")
+                step = 2
+            elif after in _FRONT_VOWELS:
+                add("S")
+            elif after in ("K", "Q"):
+                add("K")
+                step = 2
+            else:
+                add("K")
+        elif ch == "D":
+            if after == "G" and at(i + 2) in _FRONT_VOWELS:
+                add("J")
+                step = 3
+            else:
+                add("T")
+        elif ch == "G":
+            if after == "H":
+                # Initial GH is a hard G (Ghulam), elsewhere it is silent or F (Hugh, Laughlin)
+                if i == 0:
+                    add("K")
+                step = 2
+            elif after == "N" and i + 2 == length:
+                step = 1
+            elif after in _FRONT_VOWELS:
+                add("J", "K")
+            else:
+                add("K")
+        elif ch == "H":
+            # H only counts before a vowel and not after a consonant it modifies
+            if after in _VOWELS and at(i - 1) not in ("C", "G", "K", "P", "S", "T"):
+                add("H")
+        elif ch == "J":
+            add("J", "H")
+        elif ch == "K":
+            add("K")
+        elif ch == "P":
+            if after == "H":
+                add("F")
+                step = 2
+            else:
+                add("P")
+        elif ch == "Q":
+            add("K")
+        elif ch == "S":
+            if after == "H":
+                add("X")
+                step = 2
+            elif after == "C" and at(i + 2) == "H":
+                add("SK")
+                step = 3
+            elif after == "I" and at(i + 2) in ("O", "A"):
+                add("X", "S")
+            else:
+                add("S")
+        elif ch == "T":
+            if after == "H":
+                add("0", "T")
+                step = 2
+            elif after == "I" and at(i + 2) in ("O", "A"):
+                add("X")
+            elif after == "C" and at(i + 2) == "H":
+                step = 1
+            else:
+                add("T")
+        elif ch == "V":
+            add("F")
+        elif ch == "W":
+            if after in _VOWELS:
+                add("", "F")
+        elif ch == "X":
+            add("KS")
+        elif ch == "Z":
+            add("S", "TS")
+        elif ch in "FLMNR":
+            add(ch)
+
+        i += step
+
+    codes = []
+    for parts in (primary, alternate):
+        code = "".join(parts)
+        # Letters that encode the same way twice in a row count once (Muhammad: M-H-M-T)
+        code = re.sub(r"(.)\1+", r"\1", code)
+        codes.append(code[:PHONETIC_CODE_LENGTH])
+    return tuple(codes)
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def phonetic_codes(word):
+    """Double Metaphone style (primary, alternate) code of a single word; ("", "") if it has no letters."""
+    word = "".join(ch for ch in normalize(word).upper() if "A" <= ch <= "Z")
+    if not word:
+        return "", ""
+    return _encode(word)
+
+
+def phonetic_keys(text):
+    """
+    Keys of a whole name for the phonetic hash index: the sorted primary codes of its
+    words, and the sorted alternate codes when they differ. Word order does not matter.
+    """
+    codes = [phonetic_codes(word) for word in normalize(text).split()]
+    codes = [code for code in codes if code[0] or code[1]]
+    if not codes:
+        return []
+    primary = " ".join(sorted(code[0] for code in codes))
+    alternate = " ".join(sorted(code[1] for code in codes))
+    return [primary] if primary == alternate else [primary, alternate]
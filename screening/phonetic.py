@@ -0,0 +1,27 @@
+"""
+Secondary hash index from phonetic name keys (screening/normalize.phonetic_keys) to the
+entries of a NameIndex. Spelling variants of a whole name (Abdul Latif Mansur /
+Abdoul Lateef Mansoor, any word order) share a key, so they are found with one dict
+lookup however far apart their trigrams are.
+"""
+from screening.normalize import phonetic_keys
+
+
+class PhoneticIndex:
+
+    def __init__(self):
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, entry, text):
+        for key in phonetic_keys(text):
+            self.entries.setdefault(key, []).append(entry)
+
+    def lookup(self, text):
+        """Entry ids whose name shares a phonetic key with `text`."""
+        found = set()
+        for key in phonetic_keys(text):
+            found.update(self.entries.get(key, ()))
+        return found
@@ -0,0 +1,222 @@
+"""
+On-disk snapshot of the screening index (screening/index.py), memory-mapped at startup.
+
+Building a NameIndex normalizes and splits every listed name into trigrams, which takes
+seconds. The last ETL stage (snapshot_index) writes the built index to one binary file
+instead, and screening processes open it with mmap:
+
+- the NumPy arrays (postings, entry entities and sizes) are read-only views on the mapped
+  file: nothing is parsed or copied, and every process opening the file shares its pages
+- strings (trigrams, names and aliases, entity names and sources, phonetic keys) are
+  string tables, an offsets array and one UTF-8 blob, decoded when they are read
+- phonetic keys are sorted, their entries stored CSR-style, and found by binary search
+- only the trigram -> id dict is built when the file is opened (a few ms)
+
+Layout: MAGIC, then the offset and length of a JSON table of contents kept at the end of
+the file, then the sections, each 8-byte aligned. The file is written under a temporary
+name, fsynced and renamed over the previous snapshot, so a reader opens either the old or
+the new snapshot, never a partial one. An index opened from a snapshot is read-only.
+
+    python -m screening.snapshot            # rebuild the snapshot from the database
+"""
+import bisect
+import json
+import mmap
+import os
+import struct
+import time
+from collections.abc import Sequence
+
+import numpy as np
+
+from screening.index import BASE_DIR, NameIndex, build_from_cleaned, build_from_db
+from screening.normalize import phonetic_keys
+
+SCREEN_INDEX_PATH = os.getenv("SCREEN_INDEX_PATH", os.path.join(BASE_DIR, "indexes", "screening.idx"))
+
+MAGIC = b"SCRIDX01"
+# MAGIC, offset and length of the table of contents
+HEADER = struct.Struct("<8sQQ")
+ALIGNMENT = 8
+
+
+class StringTable(Sequence):
+    """String i is blob[offsets[i]:offsets[i + 1]], decoded on access."""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class EntityTable(Sequence):
+    """(name, source) of every entity, like NameIndex.entities; an empty source reads as None."""
+
+    def __init__(self, names, sources):
+        self.names = names
+        self.sources = sources
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, i):
+        return self.names[i], self.sources[i] or None
+
+
+class SnapshotPhonetic:
+    """PhoneticIndex over sorted keys: the entries of keys[i] are entries[offsets[i]:offsets[i + 1]]."""
+
+    def __init__(self, keys, offsets, entries):
+        self.keys = keys
+        self.offsets = offsets
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, text):
+        """Entry ids whose name shares a phonetic key with `text`."""
+        found = set()
+        for key in phonetic_keys(text):
+            i = bisect.bisect_left(self.keys, key)
+            if i < len(self.keys) and self.keys[i] == key:
+                found.update(self.entries[self.offsets[i]:self.offsets[i + 1]].tolist())
+        return found
+
+
+def _lengths(values):
+    return np.fromiter((len(value) for value in values), dtype=np.int64, count=len(values))
+
+
+def _offsets(lengths):
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def _string_sections(name, strings):
+    encoded = [text.encode("utf-8") for text in strings]
+    return {
+        f"{name}_offsets": _offsets(_lengths(encoded)),
+        f"{name}_data": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+    }
+
+
+def snapshot_sections(index):
+    """{section name: array} of a frozen NameIndex."""
+    grams = sorted(index.gram_ids, key=index.gram_ids.get)
+    keys = sorted(index.phonetic.entries)
+    key_entries = [index.phonetic.entries[key] for key in keys]
+    return {
+        "posting_offsets": index.posting_offsets,
+        "posting_entries": index.posting_entries,
+        "entry_entity": index.entry_entity,
+        "entry_sizes": index.entry_sizes,
+        **_string_sections("grams", grams),
+        **_string_sections("entry_text", index.entry_text),
+        **_string_sections("entity_names", [name for name, _ in index.entities]),
+        **_string_sections("entity_sources", [source or "" for _, source in index.entities]),
+        **_string_sections("phonetic_keys", keys),
+        "phonetic_offsets": _offsets(_lengths(key_entries)),
+        "phonetic_entries": np.fromiter(
+            (entry for entries in key_entries for entry in entries), dtype=np.int32,
+            count=sum(map(len, key_entries))
+        ),
+    }
+
+
+def write_snapshot(index, path=SCREEN_INDEX_PATH):
+    """Writes `index` to `path` atomically; returns the size of the file in bytes."""
+    if not index._frozen:
+        index.freeze()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 0, 0))
+        sections = {}
+        for name, array in snapshot_sections(index).items():
+            f.write(b"\0" * (-f.tell() % ALIGNMENT))
+            sections[name] = [f.tell(), array.dtype.str, len(array)]
+            f.write(np.ascontiguousarray(array).tobytes())
+
+        toc = json.dumps({
+            "entities": len(index.entities),
+            "entries": len(index.entry_text),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "sections": sections,
+        }).encode("utf-8")
+        toc_offset = f.tell()
+        f.write(toc)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, toc_offset, len(toc)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+    return os.path.getsize(path)
+
+
+def open_snapshot(path=SCREEN_INDEX_PATH):
+    """Maps the snapshot at `path`; returns a read-only NameIndex backed by the mapped file."""
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, toc_offset, toc_length = HEADER.unpack_from(mapped)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a screening index snapshot")
+    sections = json.loads(mapped[toc_offset:toc_offset + toc_length])["sections"]
+
+    def array(name):
+        offset, dtype, count = sections[name]
+        return np.frombuffer(mapped, dtype=dtype, count=count, offset=offset)
+
+    def strings(name):
+        offset, _, count = sections[f"{name}_data"]
+        return StringTable(array(f"{name}_offsets"), memoryview(mapped)[offset:offset + count])
+
+    index = NameIndex()
+    index.posting_offsets = array("posting_offsets")
+    index.posting_entries = array("posting_entries")
+    index.entry_entity = array("entry_entity")
+    index.entry_sizes = array("entry_sizes")
+    index.entry_text = strings("entry_text")
+    index.entities = EntityTable(strings("entity_names"), strings("entity_sources"))
+    index.gram_ids = {gram: gram_id for gram_id, gram in enumerate(strings("grams"))}
+    index.phonetic = SnapshotPhonetic(
+        strings("phonetic_keys"), array("phonetic_offsets"), array("phonetic_entries")
+    )
+    index._frozen = True
+    return index
+
+
+def load_index(use_db=False, path=SCREEN_INDEX_PATH):
+    """
+    The index screening uses: built from the database with `use_db`, otherwise the snapshot
+    at `path` if there is one, otherwise built from cleaned/.
+    """
+    if use_db:
+        return build_from_db()
+    if os.path.exists(path):
+        return open_snapshot(path)
+    return build_from_cleaned()
+
+
+def snapshot_index(path=SCREEN_INDEX_PATH):
+    """Builds the index from the listed records in the database and replaces the snapshot; returns the entity count."""
+    start = time.perf_counter()
+    index = build_from_db()
+    size = write_snapshot(index, path)
+    print(f"💾 Wrote screening index snapshot: {len(index.entities)} entities ({len(index)} names and aliases), "
+          f"{size / 1024 / 1024:.1f} MB in {time.perf_counter() - start:.1f}s")
+    return len(index.entities)
+
+
+if __name__ == "__main__":
+    snapshot_index()
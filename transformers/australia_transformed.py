@@ -1,38 +1,25 @@
 import pandas as pd
-import re
 import os
+from transformers.text_cleaning import (
+    clean_text, contains_garbage, first_alias, fix_mojibake, simplify_designation,
+)
 
-# Fix mojibake 
-def fix_mojibake(text):
-    if pd.isna(text):
-        return ""
-    try:
-        return text.encode('latin1').decode('utf-8')
-    except Exception:
-        return text
-
-# Clean general text: remove punctuation, normalize spaces
-def clean_text(text):
-    if pd.isna(text):
-        return ""
-    cleaned = re.sub(r'[^\w\s]', '', text)  # Remove punctuation
-    cleaned = re.sub(r'\s+', ' ', cleaned)  # Normalize whitespace
-    return cleaned.strip()
+# Cleaning steps, shared by the pipeline registry and the script entry point
+def transform_australia(df):
+    # Fix mojibake in relevant fields
+    df['Name'] = fix_mojibake(df['Name'])
+    df['Alias'] = fix_mojibake(df['Alias'])
 
-# Detect non-ASCII (likely garbage)
-def contains_garbage(text):
-    try:
-        text.encode('ascii')
-        return False
-    except UnicodeEncodeError:
-        return True
+    # Drop rows with garbage in Name or Nationality
+    df = df[~contains_garbage(df['Name']) & ~contains_garbage(df['Nationality'])].copy()
 
-# Simplify designation (only keep the first phrase/sentence)
-def simplify_designation(text):
-    if pd.isna(text):
-        return ""
-    simple = re.split(r'[.-]', text)[0]
-    return clean_text(simple)
+    # Apply text cleaning
+    df['Name'] = clean_text(df['Name'])
+    df['Alias'] = first_alias(df['Alias'])
+    df['Nationality'] = clean_text(df['Nationality'])
+    df['Sanction Type'] = clean_text(df['Sanction Type'])
+    df['Designation'] = simplify_designation(df['Designation'])
+    return df
 
 # Main cleaning function
 def clean_australia_data():
@@ -54,29 +41,7 @@ def clean_australia_data():
     except UnicodeDecodeError:
         df = pd.read_csv(input_csv, encoding='latin1')
 
-    # Fix mojibake in relevant fields
-    df['Name'] = df['Name'].apply(fix_mojibake)
-    df['Alias'] = df['Alias'].apply(lambda x: fix_mojibake(str(x)) if not pd.isna(x) else "")
-
-    # Drop rows with garbage in Name or Nationality
-    df = df[~df['Name'].apply(contains_garbage)]
-    df = df[~df['Nationality'].apply(lambda x: contains_garbage(str(x)))]
-
-    # Apply text cleaning
-    df['Name'] = df['Name'].apply(clean_text)
-    
-    def get_first_alias(alias_text):
-        if pd.isna(alias_text) or contains_garbage(str(alias_text)):
-            return None
-        # Split by common delimiters and take first part
-        first_alias = re.split(r'[;,/]', alias_text)[0]
-        return clean_text(first_alias)
-
-    df['Alias'] = df['Alias'].apply(get_first_alias)
-
-    df['Nationality'] = df['Nationality'].apply(clean_text)
-    df['Sanction Type'] = df['Sanction Type'].apply(clean_text)
-    df['Designation'] = df['Designation'].apply(simplify_designation)
+    df = transform_australia(df)
 
     # Create output dir
     os.makedirs(os.path.dirname(output_csv), exist_ok=True)
@@ -0,0 +1,99 @@
+import importlib
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from utils.artifacts import read_frame, write_frame
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# parser_key -> "module:function" taking the parsed DataFrame and returning the cleaned one.
+# Modules are imported on first use, so e.g. scikit-learn is only loaded when UK data is transformed.
+TRANSFORMERS = {
+    "un": "transformers.un_transformed:transform_un",
+    "uk": "transformers.uk_transformed:transform_uk",
+    "eur": "transformers.europe_transformed:transform_europe",
+    "aus": "transformers.australia_transformed:transform_australia",
+    "sdn": "transformers.registry:identity",
+    "swiss": "transformers.registry:identity",
+    "can": "transformers.registry:identity",
+    "ofac": "transformers.registry:identity",
+    "interpol": "transformers.registry:identity",
+}
+
+_loaded = {}
+
+
+def identity(df):
+    """Sources whose parsed output is already clean."""
+    return df
+
+
+def has_transformer(parser_key):
+    return parser_key in TRANSFORMERS
+
+
+def is_identity(parser_key):
+    return TRANSFORMERS.get(parser_key) == "transformers.registry:identity"
+
+
+def pass_through(input_path, output_path):
+    """
+    Hands an already-clean artifact to the next stage without parsing or re-serializing it.
+
+    The extracted file is hardlinked (atomically) under the cleaned name. If the filesystem
+    does not allow that, the extracted path itself is returned so the loader reads it directly.
+    Returns the path the loader should use.
+    """
+    if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+        return output_path
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_link = f"{output_path}.link"
+    try:
+        if os.path.lexists(tmp_link):
+            os.remove(tmp_link)
+        os.link(input_path, tmp_link)
+        os.replace(tmp_link, output_path)
+    except OSError as e:
+        print(f"ℹ️ Could not link {input_path} ({e}), loading it in place")
+        return input_path
+
+    print(f"✅ Linked unchanged file to: {output_path}")
+    return output_path
+
+
+def get_transformer(parser_key):
+    """Returns the transform callable registered for `parser_key`, importing its module once."""
+    if parser_key not in _loaded:
+        module_name, func_name = TRANSFORMERS[parser_key].split(":")
+        _loaded[parser_key] = getattr(importlib.import_module(module_name), func_name)
+    return _loaded[parser_key]
+
+
+def run_transform(parser_key, data):
+    """Applies the registered transformer to a DataFrame or an iterable of record dicts."""
+    df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(list(data))
+    return get_transformer(parser_key)(df)
+
+
+def transform_file(parser_key, input_path, output_path):
+    """Reads a parsed artifact (CSV or Parquet), transforms it in this process and writes the cleaned one."""
+    df = run_transform(parser_key, read_frame(input_path))
+    write_frame(df, output_path)
+    print(f"✅ Cleaned {parser_key} data saved to: {output_path}")
+
+
+def transform_file_isolated(parser_key, input_path, output_path):
+    """Same as transform_file, but in a separate interpreter (for transformers that must not share state)."""
+    subprocess.run(
+        [sys.executable, "-m", "transformers.registry", parser_key, input_path, output_path],
+        check=True,
+        cwd=BASE_DIR,
+    )
+
+
+if __name__ == "__main__":
+    transform_file(*sys.argv[1:4])
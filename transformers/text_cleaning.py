@@ -0,0 +1,67 @@
+"""
+Column-wise text cleaning shared by the UN, Europe and Australia transformers.
+
+Every function takes a pandas Series and returns a Series aligned on the same index.
+Patterns are compiled once and applied through the `.str` accessor instead of a
+Python call per value. Non-ASCII detection maps the C method str.isascii, and the
+mojibake repair, which needs a per-value fallback, runs only on the non-ASCII values.
+"""
+import re
+
+import pandas as pd
+
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+# Everything from the first alias delimiter / sentence break to the end of the value
+ALIAS_TAIL_PATTERN = re.compile(r'[;,/][\s\S]*')
+DESIGNATION_TAIL_PATTERN = re.compile(r'[.-][\s\S]*')
+
+
+def _as_text(series):
+    return series.fillna("").astype(str)
+
+
+# Clean general text: remove punctuation, normalize spaces (missing values become "")
+def clean_text(series):
+    text = _as_text(series)
+    text = text.str.replace(PUNCTUATION_PATTERN, '', regex=True)
+    text = text.str.replace(WHITESPACE_PATTERN, ' ', regex=True)
+    return text.str.strip()
+
+
+# Detect non-ASCII (likely garbage); missing values and non-text columns are not garbage
+def contains_garbage(series):
+    if not pd.api.types.is_object_dtype(series) and not pd.api.types.is_string_dtype(series):
+        return pd.Series(False, index=series.index, dtype=bool)
+    # str.isascii is a C method, so mapping it beats a regex pass; missing values stay NaN
+    return series.map(str.isascii, na_action="ignore").eq(False)
+
+
+def _fix_mojibake_value(text):
+    try:
+        return text.encode('latin1').decode('utf-8')
+    except Exception:
+        return text
+
+
+# Fix mojibake (missing values become "")
+def fix_mojibake(series):
+    # ASCII values survive the latin1 -> utf-8 round trip unchanged, so only the rest are repaired
+    garbled = contains_garbage(series)
+    fixed = series.mask(series.isna(), "")
+    fixed[garbled] = series[garbled].map(_fix_mojibake_value)
+    return fixed
+
+
+# First alias of a delimited list, cleaned; None when missing or not ASCII
+def first_alias(series):
+    usable = series.notna() & ~contains_garbage(series)
+    aliases = pd.Series(None, index=series.index, dtype=object)
+    # Only usable values are split and cleaned; the rest stay None
+    aliases[usable] = clean_text(series[usable].astype(str).str.replace(ALIAS_TAIL_PATTERN, '', n=1, regex=True))
+    return aliases
+
+
+# Simplify designation (only keep the first phrase/sentence)
+def simplify_designation(series):
+    return clean_text(_as_text(series).str.replace(DESIGNATION_TAIL_PATTERN, '', n=1, regex=True))
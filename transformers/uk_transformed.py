@@ -32,7 +32,10 @@
 # if __name__ == "__main__":
 #     clean_uk_data()
 import os
+import hashlib
+import joblib
 import pandas as pd
+import sklearn
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 
@@ -43,7 +46,49 @@ project_root = os.path.dirname(script_dir)  # Assuming 'transformers' is one fol
 input_csv = os.path.join(project_root, 'output', 'uk_uk_parsed.csv')
 output_csv = os.path.join(project_root, 'cleaned', 'uk_sanctions_cleaned.csv')
 
-df = pd.read_csv(input_csv)
+# Fitted vectorizer + classifier, one file per distinct training set
+MODEL_DIR = os.path.join(project_root, 'models', 'uk_designation')
+VECTORIZER_PARAMS = {"max_features": 1000}
+CLASSIFIER_PARAMS = {"max_iter": 1000}
+
+def training_key(texts, labels):
+    """
+    Hash of everything that determines the fitted model: the labelled rows (in order),
+    the hyperparameters and the scikit-learn version the model is pickled with.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr((sklearn.__version__, VECTORIZER_PARAMS, CLASSIFIER_PARAMS)).encode('utf-8'))
+    for text, label in zip(texts, labels):
+        digest.update(f"{text}\x1f{label}\x1e".encode('utf-8'))
+    return digest.hexdigest()
+
+def load_or_train_model(texts, labels):
+    """Returns (vectorizer, classifier), loading them from MODEL_DIR unless the training rows changed."""
+    key = training_key(texts, labels)
+    model_path = os.path.join(MODEL_DIR, f"{key}.joblib")
+
+    if os.path.exists(model_path):
+        try:
+            vectorizer, clf = joblib.load(model_path)
+            print(f"✅ Loaded cached designation model: {model_path}")
+            return vectorizer, clf
+        except Exception as e:
+            print(f"⚠️ Could not load cached model, retraining: {e}")
+
+    vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+    clf = LogisticRegression(**CLASSIFIER_PARAMS)
+    clf.fit(vectorizer.fit_transform(texts), labels)
+
+    # Write atomically, then drop models trained on older data
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    tmp_path = f"{model_path}.tmp"
+    joblib.dump((vectorizer, clf), tmp_path)
+    os.replace(tmp_path, model_path)
+    for name in os.listdir(MODEL_DIR):
+        if name.endswith('.joblib') and name != os.path.basename(model_path):
+            os.remove(os.path.join(MODEL_DIR, name))
+    print(f"✅ Trained and cached designation model: {model_path}")
+    return vectorizer, clf
 
 def fill_missing_designations(df):
     # Your existing function code unchanged
@@ -61,19 +106,24 @@ def fill_missing_designations(df):
     filtered_df['input_text'] = filtered_df['Name'].fillna('') + ' ' + filtered_df['Nationality'].fillna('')
     missing_df['input_text'] = missing_df['Name'].fillna('') + ' ' + missing_df['Nationality'].fillna('')
 
-    vectorizer = TfidfVectorizer(max_features=1000)
-    X_train_vec = vectorizer.fit_transform(filtered_df['input_text'])
+    # Fitting dominates the UK transform, so it only happens when the labelled rows change
+    vectorizer, clf = load_or_train_model(filtered_df['input_text'].tolist(), filtered_df['Designation'].tolist())
     X_missing_vec = vectorizer.transform(missing_df['input_text'])
 
-    clf = LogisticRegression(max_iter=1000)
-    clf.fit(X_train_vec, filtered_df['Designation'])
-
     missing_predictions = clf.predict(X_missing_vec)
     df.loc[missing_df.index, 'Designation'] = missing_predictions
     print(f"✅ Filled {len(missing_predictions)} missing designations.")
     return df
 
-df = fill_missing_designations(df)
-os.makedirs(os.path.dirname(output_csv), exist_ok=True)  # Make sure folder exists
-df.to_csv(output_csv, index=False)
-print(f"✅ Cleaned UK sanctions saved to: {output_csv}")
+def transform_uk(df):
+    return fill_missing_designations(df)
+
+def clean_uk_data():
+    df = pd.read_csv(input_csv)
+    df = transform_uk(df)
+    os.makedirs(os.path.dirname(output_csv), exist_ok=True)  # Make sure folder exists
+    df.to_csv(output_csv, index=False)
+    print(f"✅ Cleaned UK sanctions saved to: {output_csv}")
+
+if __name__ == "__main__":
+    clean_uk_data()
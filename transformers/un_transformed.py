@@ -1,22 +1,18 @@
 import pandas as pd
-import re
 import os
+from transformers.text_cleaning import clean_text, contains_garbage
 
-# Function to clean normal text
-def clean_text(text):
-    if pd.isna(text):
-        return ""
-    cleaned = re.sub(r'[^\w\s]', '', text)  # Remove punctuation
-    cleaned = re.sub(r'\s+', ' ', cleaned)  # Normalize whitespace
-    return cleaned.strip()
-
-# Function to detect non-ASCII garbage characters
-def contains_garbage(text):
-    try:
-        text.encode('ascii')
-        return False
-    except UnicodeEncodeError:
-        return True
+def transform_un(df):
+    # Drop rows where 'Name' or 'Nationality' contains garbage characters
+    df = df[~contains_garbage(df['Name']) & ~contains_garbage(df['Nationality'])].copy()
+
+    # Clean columns
+    df['Name'] = clean_text(df['Name'])
+    df['Alias'] = clean_text(df['Alias']).where(~contains_garbage(df['Alias']), None)
+    df['Nationality'] = clean_text(df['Nationality'])
+    df['Sanction Type'] = clean_text(df['Sanction Type'])
+    df['Designation'] = clean_text(df['Designation'])
+    return df
 
 def clean_un_data():
     # Get absolute paths based on script location
@@ -34,16 +30,7 @@ def clean_un_data():
     # Read CSV with correct encoding
     df = pd.read_csv(input_csv, encoding='latin1')  # or 'utf-8' with errors='replace'
 
-    # Drop rows where 'Name' or 'Nationality' contains garbage characters
-    df = df[~df['Name'].apply(contains_garbage)]
-    df = df[~df['Nationality'].apply(lambda x: contains_garbage(str(x)))]
-
-    # Clean columns
-    df['Name'] = df['Name'].apply(clean_text)
-    df['Alias'] = df['Alias'].apply(lambda x: None if contains_garbage(str(x)) else clean_text(x))
-    df['Nationality'] = df['Nationality'].apply(clean_text)
-    df['Sanction Type'] = df['Sanction Type'].apply(clean_text)
-    df['Designation'] = df['Designation'].apply(clean_text)
+    df = transform_un(df)
 
     # Ensure output directory exists
     os.makedirs(os.path.dirname(output_csv), exist_ok=True)
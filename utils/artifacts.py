@@ -0,0 +1,202 @@
+"""
+Reading and writing the stage artifacts in output/ and cleaned/.
+
+Artifacts are CSV by default. Set INTERMEDIATE_FORMAT=parquet to hand data between
+stages as typed, zstd-compressed Parquet instead (requires pyarrow); EXPORT_CSV=1 then
+also writes a CSV copy of every cleaned artifact for people who want to open them.
+"""
+import codecs
+import csv
+import itertools
+import os
+
+import pandas as pd
+
+INTERMEDIATE_FORMAT = os.getenv("INTERMEDIATE_FORMAT", "csv").lower()
+EXPORT_CSV = os.getenv("EXPORT_CSV", "0") == "1"
+PARQUET_COMPRESSION = "zstd"
+
+# Records buffered in memory before each write while streaming parser output
+BATCH_SIZE = 5000
+
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet artifacts require pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def artifact_format(path):
+    return "parquet" if str(path).lower().endswith(".parquet") else "csv"
+
+
+def artifact_path(directory, stem, fmt=None):
+    """Path of an artifact named `stem` in `directory`, with the extension of `fmt` (default: configured)."""
+    return os.path.join(directory, stem + EXTENSIONS[fmt or INTERMEDIATE_FORMAT])
+
+
+def write_records(records, fieldnames, output_file, batch_size=BATCH_SIZE, keep_empty=False):
+    """
+    Streams `records` into `output_file` in batches of `batch_size`, so memory does not
+    depend on the number of records. The file only replaces `output_file` once complete;
+    if writing fails, the temporary file is removed and the error raised.
+    Without records nothing is written, unless `keep_empty`: then the file has only its header.
+    Parquet output stores every field as a nullable string column.
+    Returns the number of rows written.
+    """
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    tmp_file = f"{output_file}.tmp"
+    records = iter(records)
+    batches = iter(lambda: list(itertools.islice(records, batch_size)), [])
+
+    try:
+        if artifact_format(output_file) == "parquet":
+            row_count = _write_parquet_batches(batches, fieldnames, tmp_file)
+        else:
+            row_count = _write_csv_batches(batches, fieldnames, tmp_file)
+    except Exception:
+        # A partial file never replaces output_file, and is not left behind either
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+    if not row_count and not keep_empty:
+        os.remove(tmp_file)
+        print("❌ No data to write.")
+        return 0
+
+    os.replace(tmp_file, output_file)
+    print(f"✅ File written: {output_file} ({row_count} rows)")
+    return row_count
+
+
+def _write_csv_batches(batches, fieldnames, path):
+    row_count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for batch in batches:
+            writer.writerows(batch)
+            row_count += len(batch)
+    return row_count
+
+
+def _write_parquet_batches(batches, fieldnames, path):
+    pa = _pyarrow()
+    schema = pa.schema([(name, pa.string()) for name in fieldnames])
+    row_count = 0
+    with pa.parquet.ParquetWriter(path, schema, compression=PARQUET_COMPRESSION) as writer:
+        for batch in batches:
+            columns = {
+                name: [None if row.get(name) is None else str(row[name]) for row in batch]
+                for name in fieldnames
+            }
+            writer.write_table(pa.table(columns, schema=schema))
+            row_count += len(batch)
+    return row_count
+
+
+def read_frame(path):
+    """Reads an artifact into a DataFrame (CSV: utf-8 first, fallback to latin1)."""
+    if artifact_format(path) == "parquet":
+        _pyarrow()
+        return pd.read_parquet(path)
+    try:
+        return pd.read_csv(path, encoding='utf-8')
+    except UnicodeDecodeError:
+        return pd.read_csv(path, encoding='latin1')
+
+
+def write_frame(df, path):
+    """Writes a DataFrame artifact atomically, keeping column types when the format has them."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_file = f"{path}.tmp"
+    if artifact_format(path) == "parquet":
+        _pyarrow()
+        df.to_parquet(tmp_file, index=False, compression=PARQUET_COMPRESSION)
+    else:
+        df.to_csv(tmp_file, index=False, encoding='utf-8')
+    os.replace(tmp_file, path)
+
+
+# Bytes inspected to pick the encoding of a CSV artifact
+SNIFF_BYTES = 64 * 1024
+
+BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def _latin1_fallback(error):
+    # Bytes that are not UTF-8 after a clean sample are decoded as ISO-8859-1 instead of failing
+    return error.object[error.start:error.end].decode("iso-8859-1"), error.end
+
+
+codecs.register_error("latin1_fallback", _latin1_fallback)
+
+
+def sniff_encoding(path, sample_size=SNIFF_BYTES):
+    """Encoding of a CSV artifact, decided once from its leading bytes: BOM, else UTF-8 if the sample decodes, else ISO-8859-1."""
+    with open(path, "rb") as f:
+        sample = f.read(sample_size)
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        # Not final: the sample may end in the middle of a multi-byte character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        print(f" UTF-8 decoding failed at byte {e.start}: {e.reason}, reading {path} as ISO-8859-1")
+        return "iso-8859-1"
+
+
+def iter_records(path, batch_size=BATCH_SIZE):
+    """
+    Yields the rows of an artifact as dicts, reading at most `batch_size` rows ahead, so
+    memory does not depend on the file size. Parquet nulls come back as "" so loaders see
+    the same values csv.DictReader would give them.
+    """
+    if artifact_format(path) == "parquet":
+        pa = _pyarrow()
+        for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=batch_size):
+            for row in batch.to_pylist():
+                yield {key: ("" if value is None else value) for key, value in row.items()}
+        return
+
+    encoding = sniff_encoding(path)
+    with open(path, newline='', encoding=encoding, errors="latin1_fallback") as f:
+        yield from csv.DictReader(f)
+
+
+def safe_parse_list(val):
+    """Ensure the value is a list; if it's a string, split by commas; if None, return empty list."""
+    if not val:
+        return []
+    if isinstance(val, list):
+        return val
+    if isinstance(val, str):
+        return [item.strip() for item in val.split(",") if item.strip()]
+    return []
+
+
+def read_records(path):
+    """Returns all rows of an artifact as a list of dicts (see iter_records)."""
+    return list(iter_records(path))
+
+
+def export_csv(path):
+    """Writes a CSV copy next to a Parquet artifact and returns its path."""
+    if artifact_format(path) == "csv":
+        return path
+    csv_path = os.path.splitext(path)[0] + ".csv"
+    write_frame(read_frame(path), csv_path)
+    print(f"✅ CSV export written: {csv_path}")
+    return csv_path
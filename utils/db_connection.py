@@ -1,5 +1,9 @@
 import pymysql
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,17 +16,166 @@ db_config = {
     "port": int(os.getenv("DB_PORT")),
 }
 
-def get_connection():
+# Pool settings: max open connections per process, connect attempts and the first retry delay
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+DB_CONNECT_RETRIES = int(os.getenv("DB_CONNECT_RETRIES", "3"))
+DB_RETRY_BACKOFF = float(os.getenv("DB_RETRY_BACKOFF", "0.5"))
+# Idle connections older than this are pinged before being handed out again
+DB_POOL_PING_AFTER = float(os.getenv("DB_POOL_PING_AFTER", "30"))
+# How long a checkout waits for a free slot before giving up
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "300"))
+
+def get_connection(**options):
+    """Opens a connection; extra pymysql options (e.g. local_infile=True) are passed through."""
     try:
         connection = pymysql.connect(
             host=db_config["host"],
             user=db_config["user"],
             password=db_config["password"],
             database=db_config["database"],
-            port=db_config["port"]
+            port=db_config["port"],
+            **options
         )
         print("✅ DB connection successful")
         return connection
     except pymysql.MySQLError as e:
         print(f"❌ DB connection failed: {e}")
         return None
+
+
+class ConnectionPool:
+    """
+    Keeps up to `size` connections open and hands them out with checkout()/release()
+    or the connection() context manager.
+
+    - New connections are retried `retries` times with exponential backoff.
+    - Idle connections are pinged before reuse when they sat longer than `ping_after` seconds;
+      dead ones are dropped and replaced.
+    - Returned connections are rolled back, so no transaction leaks to the next user.
+    - After a fork the child starts with an empty pool instead of sharing the parent's sockets.
+    """
+
+    def __init__(self, size=DB_POOL_SIZE, retries=DB_CONNECT_RETRIES, backoff=DB_RETRY_BACKOFF,
+                 ping_after=DB_POOL_PING_AFTER, **options):
+        self.size = size
+        self.retries = retries
+        self.backoff = backoff
+        self.ping_after = ping_after
+        self.options = options
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._reset()
+
+    def _connect(self):
+        for attempt in range(self.retries + 1):
+            try:
+                connection = pymysql.connect(
+                    host=db_config["host"],
+                    user=db_config["user"],
+                    password=db_config["password"],
+                    database=db_config["database"],
+                    port=db_config["port"],
+                    **self.options
+                )
+                print("✅ DB connection successful")
+                return connection
+            except pymysql.MySQLError as e:
+                if attempt == self.retries:
+                    print(f"❌ DB connection failed: {e}")
+                    raise
+                delay = self.backoff * 2 ** attempt
+                print(f"⚠️ DB connection failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _healthy(self, connection, idle_since):
+        if time.monotonic() - idle_since < self.ping_after:
+            return True
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def checkout(self, timeout=DB_POOL_TIMEOUT):
+        self._check_fork()
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No DB connection free after {timeout}s (pool size {self.size})")
+        try:
+            while True:
+                try:
+                    connection, idle_since = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                if self._healthy(connection, idle_since):
+                    return connection
+                self._close(connection)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, connection, discard=False):
+        if self._pid != os.getpid():
+            return
+        try:
+            if discard or not connection.open:
+                self._close(connection)
+                return
+            try:
+                connection.rollback()
+            except Exception:
+                self._close(connection)
+                return
+            self._idle.put((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        connection = self.checkout()
+        broken = False
+        try:
+            yield connection
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            # Lost or unusable connection: do not hand it out again
+            broken = True
+            raise
+        finally:
+            self.release(connection, discard=broken)
+
+    def close_all(self):
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(connection)
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(**options):
+    """Process-wide pool for the given pymysql options (one pool per distinct option set)."""
+    key = tuple(sorted(options.items()))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(**options)
+        return _pools[key]
+
+def pooled_connection(**options):
+    """Context manager checking a warm connection out of the shared pool: `with pooled_connection() as conn:`"""
+    return get_pool(**options).connection()